@@ -4,11 +4,27 @@
 #
 # This file may be distributed under the terms of the GNU GPLv3 license.
 
+import cairo
+import csv
+import functools
+import hashlib
+import json
 import logging
+import math
+import statistics
 import os.path
 import gi
 import pathlib
 import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+_IMPORT_STARTED = time.perf_counter()
 
 gi.require_version("Gtk", "3.0")
 from gi.repository import Gtk, Gdk, GdkPixbuf, Pango, GLib
@@ -17,7 +33,6 @@ from ks_includes.KlippyRest import KlippyRest
 from ks_includes.widgets.autogrid import AutoGrid
 from ks_includes.widgets.keypad import Keypad
 from ks_includes.KlippyGtk import find_widget
-from panels import extrude
 from datetime import datetime
 
 UNLOADED = "unloaded"
@@ -29,12 +44,179 @@ UNLOADING = "tool unloading"
 LOADING = "tool loading"
 TOOL_LOADED = 'tool loaded'
 
+# Per-lane telemetry ring buffers, one slot per 20s interval: 720 slots cover four hours
+TELEMETRY_CAPACITY = 720
+TELEMETRY_SAMPLE_INTERVAL = 20
+TELEMETRY_SPARKLINE_POINTS = 60
+TELEMETRY_WINDOWS = (("15m", 15 * 60), ("1h", 60 * 60), ("4h", 4 * 60 * 60))
+
+# Completed commands kept for the latency readout, how long an acknowledged
+# command waits for a visible state change before it is given up on, and how
+# long an unacknowledged one blocks duplicates (calibrations and lane tests
+# are only acknowledged when they finish, so this is generous)
+COMMAND_LATENCY_HISTORY = 50
+COMMAND_VISIBLE_TIMEOUT = 30
+COMMAND_ACK_TIMEOUT = 600
+
+# Seconds a bulk action waits after its script is acknowledged for every lane
+# to reflect it in the status stream; lanes still pending are marked failed.
+BULK_SETTLE_TIMEOUT = 30
+
+# Lane states a LANE_UNLOAD can settle in: a spool still sitting on the prep
+# sensor ends in PREP_NOT_LOAD rather than UNLOADED.
+EJECT_SETTLED_STATUSES = (UNLOADED, PREP_NOT_LOAD)
+
+# Lane move jogging: taps within the merge window are summed into one move,
+# holding a button streams chunks of the selected distance up to a limit
+JOG_MERGE_WINDOW_MS = 600
+JOG_HOLD_DELAY_MS = 400
+JOG_HOLD_INTERVAL_MS = 250
+JOG_HOLD_MAX_DISTANCE = 500
+
+# Optimistic setting changes: how long a change may stay unconfirmed, and how
+# long after the printer acknowledges it a differing status still wins
+OPTIMISTIC_TIMEOUT = 10
+OPTIMISTIC_ACK_GRACE = 3
+
+# Lane tests slower than this multiple of the median are highlighted
+LANE_TEST_SLOW_FACTOR = 1.5
+
+# Toolchange timing histograms: 1s bins up to five minutes over the last 200
+# samples. A load starting longer than the gap after an unload finished is
+# treated as a new toolchange.
+TOOLCHANGE_BIN_WIDTH = 1.0
+TOOLCHANGE_BINS = 300
+TOOLCHANGE_WINDOW = 200
+TOOLCHANGE_MAX_GAP = 30
+
+# Persistent lane timing log. Each lane/kind keeps its last LANE_TIMING_KEEP
+# samples; the newest LANE_TIMING_RECENT are compared against the median of the
+# rest, which needs at least LANE_TIMING_MIN_BASELINE samples. The file is
+# rewritten once it grows past LANE_TIMING_COMPACT_LINES lines and twice the kept samples.
+LANE_TIMING_FILE = "AFC_lane_timings.log"
+LANE_TIMING_KEEP = 50
+LANE_TIMING_RECENT = 5
+LANE_TIMING_MIN_BASELINE = 10
+LANE_TIMING_DRIFT = 1.3
+LANE_TIMING_COMPACT_LINES = 2000
+
+# Stuck-operation watchdog: a load/unload is overdue once it runs past
+# WATCHDOG_FACTOR times the lane's baseline, or WATCHDOG_DEFAULT_TIMEOUT
+# seconds when the lane has no baseline yet.
+WATCHDOG_INTERVAL = 2
+WATCHDOG_FACTOR = 2.0
+WATCHDOG_DEFAULT_TIMEOUT = 120
+
+# Main loop stall detector: a heartbeat arriving more than STALL_BUDGET_MS late
+# counts as a stall. The heartbeat only runs fast while diagnostics are shown.
+STALL_HEARTBEAT_MS = 1000
+STALL_HEARTBEAT_DIAGNOSTICS_MS = 100
+STALL_BUDGET_MS = 250
+STALL_RECENT = 20
+DIAGNOSTICS_REFRESH_INTERVAL = 1
+TRACEMALLOC_TOP = 10
+
+# Websocket traffic meter: per-second buckets over the longest rate window.
+TRAFFIC_WINDOWS = (1, 10, 60)
+
+# Trace recorder: most recent events kept for Chrome trace export.
+TRACE_MAX_EVENTS = 20000
+
+# Startup phases in seconds: import, resources, bootstrap, layout, first_paint.
+STARTUP_PROFILE = {}
+
+# Assets pre-rendered by afc_precompile.py; names and format must match it.
+PRECOMPILED_DIR = "precompiled"
+PRECOMPILED_MANIFEST = "manifest.json"
+PRECOMPILED_FORMAT = 1
+
+# Lane cards are LANE_CARD_WIDTH px wide including margins, at most
+# LANE_GRID_MAX_COLUMNS to a row. The column count is recomputed when the
+# lane area is allocated a new width and remembered per screen geometry.
+LANE_CARD_WIDTH = 160
+LANE_GRID_MAX_COLUMNS = 4
+
+# With PAGED_UNITS_MIN or more units the lane area shows one unit at a time,
+# building each unit's cards on first view, unless toggled in More Controls.
+PAGED_UNITS_MIN = 4
+
+# Lane cards are filled in after the skeleton in idle slices of this many ms.
+LANE_FILL_BUDGET_MS = 8
+
+# Websocket actions after which the cached AFC configuration can no longer be trusted.
+KLIPPY_STATE_ACTIONS = ("notify_klippy_disconnected", "notify_klippy_shutdown", "notify_klippy_ready")
+
+# Panel logging: per-category minimum levels, overridable with
+# AFC_PANEL_LOG_LEVELS="status=warning,menu=debug". AFC_PANEL_DEBUG=1 enables
+# debug output and verbose dumps for every category. Repeated messages for the
+# same key are folded into one summary per LOG_AGGREGATE_WINDOW seconds.
+LOG_CATEGORY_LEVELS = {
+    "init": logging.INFO,
+    "status": logging.INFO,
+    "ui": logging.INFO,
+    "menu": logging.INFO,
+    "sensors": logging.INFO,
+    "layout": logging.INFO,
+}
+LOG_AGGREGATE_WINDOW = 10
+
+# Extruder fields from the AFC status tracked by the extruder overview.
+EXTRUDER_FIELDS = (
+    "lane_loaded", "tool_start", "tool_start_status", "tool_end", "tool_end_status",
+    "buffer", "tool_load_speed", "tool_unload_speed",
+)
+
+# Panel attributes holding GLib source ids, reported on the diagnostics page.
+GLIB_SOURCE_ATTRS = (
+    "sensor_poll_id", "jog_timer", "jog_hold_timer", "optimistic_timer",
+    "watchdog_timer", "diagnostics_timer", "lane_fill_id", "prewarm_id", "reflow_id", "bulk_timer",
+)
+
+# Spool icons are cached by (color, fill in pixels, width, height). After the
+# lane cards are filled, idle slices of PREWARM_SLICE_MS render each lane's
+# color at the next PREWARM_FILL_STEPS fill levels and build the lane menus.
+# Prewarming pauses for PREWARM_BACKOFF seconds after user input or a status update.
+SPOOL_ICON_CACHE_SIZE = 128
+PREWARM_SLICE_MS = 5
+PREWARM_FILL_STEPS = 3
+PREWARM_BACKOFF = 2
+
+# Lane status classification. The raw inputs are packed into a small integer
+# code which indexes a table precomputed at import time.
+LANE_CODE_PREP = 1
+LANE_CODE_LOAD = 2
+LANE_CODE_TOOL_LOADED = 4
+LANE_STATUS_STRING_CODES = {
+    "Tool Loading": 8,
+    "Tool Unloading": 16,
+}
+LANE_CODE_COUNT = 32
+
+LANE_STATUS_STYLES = {
+    TOOLED: ("status-tooled", "bold-text"),
+    LOADED: ("status-loaded",),
+    PREP_NOT_LOAD: ("status-warning",),
+    LOAD_NOT_PREP: ("status-warning",),
+}
+DEFAULT_LANE_STATUS_STYLE = ("status-lane-empty",)
+LANE_STATUS_CLASSES = frozenset(
+    style for styles in LANE_STATUS_STYLES.values() for style in styles
+) | frozenset(DEFAULT_LANE_STATUS_STYLE)
+
 RESPONSE_LOAD = 1001
 RESPONSE_EJECT = 1002
 RESPONSE_SET = 1003
 RESPONSE_UNLOAD = 1004
 RESPONSE_UNSET = 1005
 
+# State history ring buffer
+HISTORY_MAX_ENTRIES = 4096
+HISTORY_WINDOW_MINUTES = 30
+HISTORY_LANE_FIELDS = (
+    "status", "map", "runout_lane", "material", "weight", "color",
+    "load", "prep", "tool_loaded", "buffer_status",
+)
+
 SYSTEM_TYPE_ICONS = {
     "Box_Turtle": "box_turtle_colored_logo.svg",
     "'Box Turtle'": "box_turtle_colored_logo.svg",
@@ -46,6 +228,480 @@ SYSTEM_TYPE_ICONS = {
     "'AMS'": "box_turtle_colored_logo.svg",
 }
 
+def lane_status_code(prep, load, tool_loaded, status_string):
+    """
+    Pack the lane status inputs into an index for LANE_STATUS_TABLE.
+    """
+    return ((LANE_CODE_PREP if prep else 0)
+            | (LANE_CODE_LOAD if load else 0)
+            | (LANE_CODE_TOOL_LOADED if tool_loaded else 0)
+            | LANE_STATUS_STRING_CODES.get(status_string, 0))
+
+
+def _classify_lane_code(code):
+    prep = code & LANE_CODE_PREP
+    load = code & LANE_CODE_LOAD
+    if prep and load:
+        if code & LANE_STATUS_STRING_CODES["Tool Loading"]:
+            return LOADING
+        if code & LANE_STATUS_STRING_CODES["Tool Unloading"]:
+            return UNLOADING
+        if code & LANE_CODE_TOOL_LOADED:
+            return TOOLED
+        return LOADED
+    if prep:
+        return PREP_NOT_LOAD
+    if load:
+        return LOAD_NOT_PREP
+    return UNLOADED
+
+
+LANE_STATUS_TABLE = tuple(_classify_lane_code(code) for code in range(LANE_CODE_COUNT))
+LANE_STYLE_TABLE = tuple(
+    LANE_STATUS_STYLES.get(status, DEFAULT_LANE_STATUS_STYLE) for status in LANE_STATUS_TABLE
+)
+
+
+def draw_sparkline(cr, width, height, values, rgba=(0.26, 0.62, 0.96, 1.0), low=None, high=None):
+    """
+    Draw ``values`` as a polyline filling a ``width`` x ``height`` cairo area.
+    """
+    if len(values) < 2:
+        return
+    low = min(values) if low is None else low
+    high = max(values) if high is None else high
+    span = (high - low) or 1
+    step = width / (len(values) - 1)
+    cr.set_source_rgba(*rgba)
+    cr.set_line_width(1.5)
+    for index, value in enumerate(values):
+        y = height - 1 - (value - low) / span * (height - 2)
+        if index == 0:
+            cr.move_to(0, y)
+        else:
+            cr.line_to(index * step, y)
+    cr.stroke()
+
+
+def command_lane(command):
+    """
+    Return the lane a G-code command targets through its LANE= parameter, or None.
+    """
+    match = re.search(r"\bLANE=(\S+)", command, re.IGNORECASE)
+    return match[1] if match else None
+
+
+def attribute_batch_error(commands, message):
+    """
+    Find the command in a failed batch that ``message`` refers to.
+
+    Klipper stops a script at the first failing line and reports only that
+    error. Bulk scripts repeat each command once per lane, so a command name
+    alone only identifies the line when it is unique in the batch; otherwise
+    the full line or a single lane named in the message is required.
+
+    :return: Index into ``commands``, or None if it cannot be determined.
+    """
+    message = (message or "").upper()
+    names = [command.split(None, 1)[0].upper() if command.strip() else "" for command in commands]
+    lanes = [command_lane(command) for command in commands]
+
+    for index, command in enumerate(commands):
+        if command.strip().upper() in message:
+            return index
+
+    named_lanes = {lane for lane in lanes if lane and re.search(rf"(?<!\w){re.escape(lane.upper())}(?!\w)", message)}
+    if len(named_lanes) == 1:
+        lane = named_lanes.pop()
+        candidates = [index for index in range(len(commands)) if lanes[index] == lane]
+        # Prefer the lane's command whose name the message also mentions
+        return next((index for index in candidates if names[index] and names[index] in message), candidates[0])
+
+    for index, name in enumerate(names):
+        if name and name in message and names.count(name) == 1:
+            return index
+    return None
+
+
+def get_log_dir():
+    """
+    Return the directory KlipperScreen writes its log to.
+    """
+    for handler in logging.getLogger().handlers:
+        filename = getattr(handler, "baseFilename", None)
+        if filename:
+            return os.path.dirname(filename)
+    default = os.path.expanduser("~/printer_data/logs")
+    return default if os.path.isdir(default) else tempfile.gettempdir()
+
+
+def get_config_dir(config):
+    """
+    Return the directory holding the KlipperScreen config file.
+
+    :param config: KlipperScreen config object.
+    """
+    config_path = getattr(config, "config_path", None)
+    if config_path:
+        return os.path.dirname(config_path)
+    default = os.path.expanduser("~/printer_data/config")
+    return default if os.path.isdir(default) else tempfile.gettempdir()
+
+
+def afc_layout(afc_data):
+    """
+    Return the units and lanes in an AFC status payload as nested tuples, in payload order.
+    """
+    return tuple(
+        (unit_name, tuple(lane_name for lane_name, lane_data in unit_data.items()
+                          if isinstance(lane_data, dict) and lane_name.startswith("lane")))
+        for unit_name, unit_data in afc_data.items()
+        if unit_name != "system" and isinstance(unit_data, dict)
+    )
+
+
+def get_rss_bytes():
+    """
+    Return the resident set size of this process, or None where /proc is unavailable.
+    """
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+_panel_resources = {}
+
+
+def afc_icons_dir():
+    klipperscreendir = pathlib.Path(__file__).parent.resolve().parent
+    return os.path.join(klipperscreendir, "afc_icons")
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_hex_color(color):
+    """
+    Return (r, g, b, a) in 0..1 for #RGB, #RRGGBB or #RRGGBBAA, otherwise None.
+    """
+    if not isinstance(color, str) or not color.startswith("#"):
+        return None
+    digits = color[1:]
+    if len(digits) == 3:
+        digits = "".join(digit * 2 for digit in digits)
+    if len(digits) == 6:
+        digits += "ff"
+    if len(digits) != 8:
+        return None
+    try:
+        return tuple(int(digits[i:i + 2], 16) / 255 for i in (0, 2, 4, 6))
+    except ValueError:
+        return None
+
+
+class PrecompiledAssets:
+    """
+    PNG assets rendered at install time by afc_precompile.py.
+
+    An asset is only used while both the PNG and the SVG it was rendered from
+    match the hashes in the manifest; callers render the SVG otherwise.
+    """
+
+    def __init__(self, icons_dir):
+        self.icons_dir = icons_dir
+        self.directory = os.path.join(icons_dir, PRECOMPILED_DIR)
+        self.assets = None
+        self.sources = {}  # source SVG -> still matches the manifest
+        self.pixbufs = {}  # asset name -> pixbuf, or None if unusable
+
+    def _load_manifest(self):
+        self.assets = {}
+        path = os.path.join(self.directory, PRECOMPILED_MANIFEST)
+        try:
+            with open(path) as handle:
+                manifest = json.load(handle)
+        except FileNotFoundError:
+            logging.info("No precompiled AFC assets found, rendering SVGs at runtime")
+            return
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not read {path}: {e}")
+            return
+        if manifest.get("format") != PRECOMPILED_FORMAT:
+            logging.warning(f"Ignoring {path} with unsupported format {manifest.get('format')}")
+            return
+        self.assets = manifest.get("assets", {})
+
+    def _source_current(self, source, expected):
+        if source not in self.sources:
+            try:
+                current = sha256_file(os.path.join(self.icons_dir, source)) == expected
+            except OSError:
+                current = False
+            if not current:
+                logging.info(f"Precompiled assets for {source} are stale, rendering the SVG")
+            self.sources[source] = current
+        return self.sources[source]
+
+    def pixbuf(self, name):
+        """
+        Return the named asset, or None if it is missing or stale.
+        """
+        if name in self.pixbufs:
+            return self.pixbufs[name]
+        if self.assets is None:
+            self._load_manifest()
+        pixbuf = None
+        entry = self.assets.get(name)
+        if entry is not None and self._source_current(entry.get("source"), entry.get("source_sha256")):
+            path = os.path.join(self.directory, name)
+            try:
+                if sha256_file(path) == entry.get("sha256"):
+                    pixbuf = GdkPixbuf.Pixbuf.new_from_file(path)
+                else:
+                    logging.info(f"Precompiled asset {name} does not match its manifest hash")
+            except (OSError, GLib.Error) as e:
+                logging.warning(f"Could not load precompiled asset {path}: {e}")
+        self.pixbufs[name] = pixbuf
+        return pixbuf
+
+
+def precompiled_assets():
+    assets = _panel_resources.get("precompiled")
+    if assets is None:
+        assets = _panel_resources["precompiled"] = PrecompiledAssets(afc_icons_dir())
+    return assets
+
+
+def composite_spool_icon(color, fill_ratio, width, height):
+    """
+    Compose a spool icon from the precompiled back, filament mask and front layers.
+
+    :param color: Filament color, or None for an empty spool.
+    :param fill_ratio: Vertical scale of the filament about the spool's centre.
+    :return: Pixbuf, or None if a layer is unavailable or the color is not hex.
+    """
+    assets = precompiled_assets()
+    layers = [assets.pixbuf(f"spool_{layer}_{width}x{height}.png") for layer in ("back", "mask", "front")]
+    if None in layers:
+        return None
+    rgba = None
+    if color is not None:
+        rgba = parse_hex_color(color)
+        if rgba is None:
+            return None  # Named colors are left to the SVG renderer
+    back, mask, front = layers
+
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+    cr = cairo.Context(surface)
+    Gdk.cairo_set_source_pixbuf(cr, back, 0, 0)
+    cr.paint()
+    if rgba is not None:
+        cr.save()
+        cr.translate(0, (1 - fill_ratio) * height / 2)
+        cr.scale(1, fill_ratio)
+        cr.set_source_rgba(*rgba)
+        cr.mask_surface(Gdk.cairo_surface_create_from_pixbuf(mask, 1, None), 0, 0)
+        cr.restore()
+    Gdk.cairo_set_source_pixbuf(cr, front, 0, 0)
+    cr.paint()
+    return Gdk.pixbuf_get_from_surface(surface, 0, 0, width, height)
+
+
+def spool_svg_template():
+    """
+    Return the spool SVG with clip-paths removed and xmlns set, loaded once.
+    """
+    template = _panel_resources.get("spool_svg")
+    if template is None:
+        spool_icon_path = "/path/to/spool.svg"
+        if not os.path.isfile(spool_icon_path):
+            spool_icon_path = os.path.join(afc_icons_dir(), "FilamentReelIcon.svg")
+        with open(spool_icon_path, 'r') as f:
+            template = f.read()
+
+        # Remove old clip-paths if any
+        template = re.sub(r'clip-path="url\(#.*?\)"', '', template)
+
+        # Add xmlns if missing
+        if "<svg" in template and "xmlns=" not in template:
+            template = template.replace(
+                "<svg", "<svg xmlns='http://www.w3.org/2000/svg'", 1
+            )
+        _panel_resources["spool_svg"] = template
+    return template
+
+
+def lane_grid_columns(width, card_width=LANE_CARD_WIDTH):
+    """
+    Return how many lane cards fit in a row of the given width.
+    """
+    return min(LANE_GRID_MAX_COLUMNS, max(1, width // card_width))
+
+
+def spool_fill_ratio(weight, max_weight=1000):
+    """
+    Return the vertical scale of the filament for a spool weight in grams.
+    """
+    min_fill_ratio = 0.29
+    norm = min(max(weight / max_weight, 0), 1)
+    return min_fill_ratio + (1 - min_fill_ratio) * (norm ** 0.6)
+
+
+def render_spool_icon(color, fill_ratio, width, height):
+    """
+    Render a spool icon, from the precompiled layers when possible and the SVG otherwise.
+
+    :param color: Filament color, or None for an empty spool.
+    :return: Pixbuf, or None if the SVG could not be rendered.
+    """
+    pixbuf = composite_spool_icon(color, fill_ratio, width, height)
+    if pixbuf is not None:
+        return pixbuf
+
+    total_height = 499.8
+    translate_y = (1 - fill_ratio) * total_height / 2
+    transform_group = f'<g id="scaled_filament" transform="translate(0,{translate_y}) scale(1,{fill_ratio})">'
+
+    # Determine fill color or transparency
+    if color is None:
+        fill_style = 'fill: transparent'
+    else:
+        fill_style = f'fill: {color}'
+
+    spool_icon_svg = spool_svg_template()
+
+    # Replace style in filament_base and apply transform
+    spool_icon_svg = re.sub(
+        r'(<path[^>]+id="filament_base"[^>]+)style="[^"]+"',
+        rf'\1style="{fill_style}"',
+        spool_icon_svg
+    )
+    spool_icon_svg = re.sub(
+        r'(<path[^>]+id="filament_base"[^>]*?/?>)',
+        rf'{transform_group}\1</g>',
+        spool_icon_svg
+    )
+
+    loader = GdkPixbuf.PixbufLoader()
+    try:
+        loader.write(spool_icon_svg.encode())
+        loader.close()
+        return loader.get_pixbuf().scale_simple(width, height, GdkPixbuf.InterpType.BILINEAR)
+    except GLib.Error as e:
+        logging.error(f"Failed to load SVG: {e}")
+        return None
+
+
+class SpoolIconCache:
+    """
+    Least-recently-used cache of rendered spool icons.
+
+    The fill ratio is rounded to whole pixels of the icon height, so weight
+    changes too small to show reuse the same pixbuf.
+    """
+
+    def __init__(self, capacity=SPOOL_ICON_CACHE_SIZE):
+        self.capacity = capacity
+        self.icons = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(color, fill_ratio, width, height):
+        return color, round(fill_ratio * height), width, height
+
+    def __contains__(self, key):
+        return key in self.icons
+
+    def get(self, color, fill_ratio, width, height, **trace_args):
+        """
+        Return the icon for the given state, rendering and caching it on a miss.
+        """
+        key = self.key(color, fill_ratio, width, height)
+        pixbuf = self.icons.get(key)
+        if pixbuf is not None:
+            self.icons.move_to_end(key)
+            self.hits += 1
+            return pixbuf
+        self.misses += 1
+        with trace_recorder.span("lane icon", "icon", width=width, height=height, **trace_args):
+            pixbuf = render_spool_icon(color, key[1] / height, width, height)
+        if pixbuf is not None:
+            self.icons[key] = pixbuf
+            if len(self.icons) > self.capacity:
+                self.icons.popitem(last=False)
+        return pixbuf
+
+
+def load_icon_pixbuf(path, size, scale=1):
+    """
+    Load an image scaled to ``size`` px, cached for the life of the process.
+
+    A precompiled PNG is used when available, the SVG is rendered otherwise.
+
+    :param scale: Device scale factor; the pixbuf is ``size * scale`` px.
+    """
+    key = (path, size, scale)
+    pixbuf = _panel_resources.get(key)
+    if pixbuf is None:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        suffix = "@2x" if scale == 2 else ""
+        pixbuf = precompiled_assets().pixbuf(f"{stem}_{size}{suffix}.png")
+        if pixbuf is None:
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
+                filename=path,
+                width=size * scale,
+                height=size * scale,
+                preserve_aspect_ratio=True
+            )
+        _panel_resources[key] = pixbuf
+    return pixbuf
+
+
+def ensure_panel_resources():
+    """
+    Install the panel CSS and load the spool template once per process.
+
+    :return: True if this call did the work, False if it was already done.
+    """
+    if "css_provider" in _panel_resources:
+        return False
+    started = time.perf_counter()
+    provider = Gtk.CssProvider()
+    provider.load_from_data(PANEL_CSS)
+    Gtk.StyleContext.add_provider_for_screen(
+        Gdk.Screen.get_default(),
+        provider,
+        Gtk.STYLE_PROVIDER_PRIORITY_USER
+    )
+    _panel_resources["css_provider"] = provider
+    try:
+        spool_svg_template()
+    except OSError as e:
+        logging.error(f"Could not load spool icon template: {e}")
+    STARTUP_PROFILE["resources"] = time.perf_counter() - started
+    return True
+
+
+def walk_widgets(widget):
+    """
+    Yield ``widget`` and all its descendants, including MenuButton popovers.
+    """
+    yield widget
+    if isinstance(widget, Gtk.MenuButton) and widget.get_popover() is not None:
+        yield from walk_widgets(widget.get_popover())
+    if isinstance(widget, Gtk.Container):
+        for child in widget.get_children():
+            yield from walk_widgets(child)
+
+
 def get_widths(widget, name=None):
     pref_min, pref_nat = widget.get_preferred_width()
     alloc = widget.get_allocated_width()
@@ -131,6 +787,7 @@ class AFClane:
         self.runout_lane = lane_data.get("runout_lane")
         self.filament_status = lane_data.get("filament_status")
         self.filament_status_led = lane_data.get("filament_status_led")
+        self.afc_status = lane_data.get("status")
         self.lane_status = None
 
     def __repr__(self):
@@ -139,71 +796,1085 @@ class AFClane:
 
     def icon(self, width=64, height=64):
         if not hasattr(self, '_icon') or self._icon is None:
-            klipperscreendir = pathlib.Path(__file__).parent.resolve().parent
-            spool_icon_path = "/path/to/spool.svg"
-            if not os.path.isfile(spool_icon_path):
-                spool_icon_path = os.path.join(
-                    klipperscreendir, "afc_icons", "FilamentReelIcon.svg"
-                )
-            with open(spool_icon_path, 'r') as f:
-                spool_icon_svg = f.read()
-
             weight = self.weight or 1000
             if self.weight is None:
                 weight = 1000
-            max_weight = 1000
+            color = None if weight == 0 else (self.color or "#000000B3")
+            self._icon = spool_icon_cache.get(color, spool_fill_ratio(weight), width, height, lane=self.name)
+        return self._icon
+
+class LaneTelemetry:
+    """
+    Fixed-size ring buffers of sampled lane values backed by typed arrays.
+
+    Each slot covers one TELEMETRY_SAMPLE_INTERVAL, so the ring always spans
+    capacity intervals however often values change. Samples within an interval
+    are folded into its slot: weight and buffer status keep the latest value,
+    flags keep their maximum so short flaps stay visible.
+    """
+
+    FIELDS = ("weight", "load", "prep", "tool_loaded", "buffer_status")
+    # Fields where downsampling keeps the maximum rather than the mean so
+    # short flaps remain visible in long windows
+    FLAG_FIELDS = ("load", "prep", "tool_loaded")
+
+    _buffer_status_codes = {None: 0}
+    _buffer_status_names = [None]
+
+    def __init__(self, capacity=TELEMETRY_CAPACITY):
+        self.capacity = capacity
+        self.times = array("d", [0.0]) * capacity
+        self.weight = array("f", [0.0]) * capacity
+        self.load = array("b", [0]) * capacity
+        self.prep = array("b", [0]) * capacity
+        self.tool_loaded = array("b", [0]) * capacity
+        self.buffer_status = array("b", [0]) * capacity
+        self.count = 0
+        self.head = 0  # Next slot to write
+        self._last_time = 0.0  # Start of the interval held by the newest slot
+
+    @classmethod
+    def buffer_status_code(cls, status):
+        """
+        Intern a buffer status string as a small integer shared by all lanes.
+        """
+        code = cls._buffer_status_codes.get(status)
+        if code is None:
+            if len(cls._buffer_status_names) >= 127:
+                return 0
+            code = len(cls._buffer_status_names)
+            cls._buffer_status_codes[status] = code
+            cls._buffer_status_names.append(status)
+        return code
+
+    @classmethod
+    def buffer_status_name(cls, code):
+        return cls._buffer_status_names[code] if 0 <= code < len(cls._buffer_status_names) else None
+
+    def sample(self, lane, timestamp=None):
+        """
+        Sample the lane's current values.
+
+        :return: True if a slot was written or changed.
+        """
+        now = time.monotonic() if timestamp is None else timestamp
+        values = (
+            float(lane.weight or 0),
+            1 if lane.load else 0,
+            1 if lane.prep else 0,
+            1 if lane.tool_loaded else 0,
+            self.buffer_status_code(lane.buffer_status),
+        )
+        if self.count and now - self._last_time < TELEMETRY_SAMPLE_INTERVAL:
+            index = (self.head - 1) % self.capacity
+            current = (self.weight[index], self.load[index], self.prep[index], self.tool_loaded[index],
+                       self.buffer_status[index])
+            values = (values[0], max(current[1], values[1]), max(current[2], values[2]),
+                      max(current[3], values[3]), values[4])
+            # Compare through the float32 slot so an unchanged weight is not a change
+            if values[1:] == current[1:] and array("f", [values[0]])[0] == current[0]:
+                return False
+        else:
+            index = self.head
+            self.times[index] = now
+            self.head = (index + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            self._last_time = now
+
+        self.weight[index], self.load[index], self.prep[index], self.tool_loaded[index], \
+            self.buffer_status[index] = values
+        return True
+
+    def _ordered_indexes(self):
+        start = (self.head - self.count) % self.capacity
+        return [(start + offset) % self.capacity for offset in range(self.count)]
+
+    def series(self, field, window=None, points=None, now=None):
+        """
+        Return the samples of ``field`` from oldest to newest.
+
+        :param window: Only include samples from the last ``window`` seconds.
+        :param points: Downsample into this many time buckets. Buckets without
+                       samples repeat the previous value.
+        """
+        data = getattr(self, field)
+        now = time.monotonic() if now is None else now
+        start = now - window if window else None
+        indexes = [i for i in self._ordered_indexes() if start is None or self.times[i] >= start]
+        if not points or len(indexes) <= points:
+            return [data[i] for i in indexes]
+        if start is None:
+            start = self.times[indexes[0]]
+
+        bucket_width = (now - start) / points or 1
+        buckets = [[] for _ in range(points)]
+        for i in indexes:
+            bucket = min(points - 1, int((self.times[i] - start) / bucket_width))
+            buckets[bucket].append(data[i])
+
+        reduced = []
+        previous = data[indexes[0]]
+        for bucket in buckets:
+            if bucket:
+                if field in self.FLAG_FIELDS:
+                    previous = max(bucket)
+                elif field == "buffer_status":
+                    previous = bucket[-1]
+                else:
+                    previous = sum(bucket) / len(bucket)
+            reduced.append(previous)
+        return reduced
+
+
+class AFCCommandQueue:
+    """
+    Track G-code scripts sent by the panel until Klipper acknowledges them.
+
+    Identical scripts already in flight are suppressed. For each command the
+    time from send to acknowledgement and from send to the first visible state
+    change is recorded.
+    """
+
+    def __init__(self, send, on_change=None):
+        """
+        :param send: Callable ``send(script, callback, *args)`` issuing the request.
+        :param on_change: Called without arguments whenever the queue changes.
+        """
+        self._send = send
+        self._on_change = on_change
+        self.in_flight = {}  # script -> [sent, acked, visible, callback]
+        self._awaiting_visible = []  # Acknowledged entries without a visible change yet
+        self.completed = deque(maxlen=COMMAND_LATENCY_HISTORY)  # (script, ack_latency, visible_latency)
+        self.suppressed = 0
+
+    def __len__(self):
+        return len(self.in_flight)
+
+    def __contains__(self, script):
+        return script in self.in_flight
+
+    def submit(self, script, on_ack=None):
+        """
+        Send ``script`` unless an identical one is still in flight.
+
+        :param on_ack: Called with the response once Klipper acknowledges.
+        :return: False if the script was suppressed as a duplicate.
+        """
+        self.expire()
+        if script in self.in_flight:
+            self.suppressed += 1
+            logging.info(f"Suppressed duplicate command in flight: {script}")
+            return False
+        self.in_flight[script] = [time.monotonic(), None, None, on_ack]
+        self._send(script, self._on_response, script)
+        self._changed()
+        return True
+
+    def _on_response(self, response, method, params, script):
+        entry = self.in_flight.pop(script, None)
+        if entry is None:
+            return False
+        entry[1] = time.monotonic()
+        if entry[2] is None:
+            self._awaiting_visible.append((script, entry))
+        else:
+            self._complete(script, entry)
+        if entry[3]:
+            entry[3](response)
+        self._changed()
+        return False
+
+    def mark_visible(self, names):
+        """
+        Note that a state change became visible, completing the waiting commands it belongs to.
+
+        A command targeting a lane only matches a change to that lane; commands
+        without a LANE= parameter match any change.
 
-            # --- SCALE FUNCTION ---
-            min_fill_ratio = 0.29
-            norm = min(max(weight / max_weight, 0), 1)
-            scaled_ratio = min_fill_ratio + (1 - min_fill_ratio) * (norm ** 0.6)
+        :param names: Names of the entities whose state changed.
+        """
+        now = time.monotonic()
+
+        def matches(script):
+            lane = command_lane(script)
+            return lane is None or lane in names
+
+        for script, entry in self.in_flight.items():
+            if entry[2] is None and matches(script):
+                entry[2] = now
+        waiting = [item for item in self._awaiting_visible if matches(item[0])]
+        if not waiting:
+            return
+        self._awaiting_visible = [item for item in self._awaiting_visible if item not in waiting]
+        for script, entry in waiting:
+            entry[2] = now
+            self._complete(script, entry)
+        self._changed()
+
+    def expire(self):
+        """
+        Complete acknowledged commands that never produced a visible change, and
+        drop commands whose acknowledgement has not arrived within COMMAND_ACK_TIMEOUT.
+        """
+        now = time.monotonic()
+        lost = [script for script, entry in self.in_flight.items() if now - entry[0] > COMMAND_ACK_TIMEOUT]
+        for script in lost:
+            self._drop(script, "no acknowledgement")
+        expired = [item for item in self._awaiting_visible if now - item[1][1] > COMMAND_VISIBLE_TIMEOUT]
+        if expired:
+            self._awaiting_visible = [item for item in self._awaiting_visible if item not in expired]
+            for script, entry in expired:
+                self._complete(script, entry)
+        if lost or expired:
+            self._changed()
+
+    def clear(self, reason):
+        """
+        Drop every command in flight, e.g. when Klipper disconnects and their replies are lost.
+        """
+        # Callbacks may queue follow-up commands (e.g. the next lane test); drop those too
+        while self.in_flight:
+            self._drop(next(iter(self.in_flight)), reason)
+        self._awaiting_visible = []
+        self._changed()
+
+    def _drop(self, script, reason):
+        entry = self.in_flight.pop(script)
+        logging.warning(f"Dropping command {script} after {time.monotonic() - entry[0]:.0f}s: {reason}")
+        # Callers re-enable buttons and settle their state in the ack callback
+        if entry[3]:
+            entry[3]({"error": {"message": reason}})
+
+    def _complete(self, script, entry):
+        sent, acked, visible, _callback = entry
+        self.completed.append((script, acked - sent, visible - sent if visible is not None else None))
+
+    def _changed(self):
+        if self._on_change:
+            self._on_change()
+
+
+class PendingChange:
+    """
+    A setting change applied locally and awaiting confirmation from the printer.
+    """
+
+    def __init__(self, version, value, previous, apply, widget):
+        self.version = version
+        self.value = value
+        self.authoritative = previous  # Last value reported by the printer
+        self.apply = apply
+        self.widget = widget
+        self.sent = time.monotonic()
+        self.acked = None
+
+
+class OptimisticUpdates:
+    """
+    Versioned registry of optimistic setting changes.
+
+    A change is applied locally when proposed. Status updates that still carry
+    the old value are held back until the change is confirmed, rejected by the
+    printer, or times out, at which point the authoritative value is restored.
+    """
+
+    def __init__(self):
+        self._pending = {}  # key -> PendingChange
+        self._version = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __contains__(self, key):
+        return key in self._pending
+
+    def propose(self, key, value, previous, apply, widget=None):
+        """
+        Apply ``value`` locally and track it under ``key``.
+
+        :param apply: Callable applying a value to the panel state and widgets.
+        :return: The version of the change, used to match its acknowledgement.
+        """
+        existing = self._pending.get(key)
+        if existing is not None:
+            previous = existing.authoritative
+        self._version += 1
+        self._pending[key] = PendingChange(self._version, value, previous, apply, widget)
+        apply(value)
+        return self._version
+
+    def acknowledge(self, key, version, ok):
+        """
+        Handle the printer's reply to the script carrying a change.
+
+        :return: The rolled back change if the printer rejected it, otherwise None.
+        """
+        change = self._pending.get(key)
+        if change is None or change.version != version:
+            return None
+        if ok:
+            change.acked = time.monotonic()
+            return None
+        del self._pending[key]
+        change.apply(change.authoritative)
+        return change
+
+    def reconcile(self, key, authoritative):
+        """
+        Reconcile a pending change with the value from a status update.
+
+        :return: (value to show, change resolved by this update or None). The
+                 change was rolled back if the value differs from ``change.value``.
+        """
+        change = self._pending.get(key)
+        if change is None:
+            return authoritative, None
+        change.authoritative = authoritative
+        if authoritative == change.value:
+            del self._pending[key]
+            return authoritative, change
+        if change.acked is not None and time.monotonic() - change.acked > OPTIMISTIC_ACK_GRACE:
+            # Accepted by Klipper but the status disagrees: the printer wins
+            del self._pending[key]
+            change.apply(authoritative)
+            return authoritative, change
+        return change.value, None
+
+    def expire(self):
+        """
+        Roll back changes that stayed unconfirmed for OPTIMISTIC_TIMEOUT.
+
+        :return: List of (key, change) that timed out.
+        """
+        now = time.monotonic()
+        expired = [(key, change) for key, change in self._pending.items() if now - change.sent > OPTIMISTIC_TIMEOUT]
+        for key, change in expired:
+            del self._pending[key]
+            change.apply(change.authoritative)
+        return expired
 
-            total_height = 499.8
-            scale_y = scaled_ratio
-            translate_y = (1 - scale_y) * total_height / 2
 
-            transform_group = f'<g id="scaled_filament" transform="translate(0,{translate_y}) scale(1,{scale_y})">'
+class LaneTestRun:
+    """
+    Timing and outcome of one lane in a sequenced lane test.
+    """
 
-            # Remove old clip-paths if any
-            spool_icon_svg = re.sub(r'clip-path="url\(#.*?\)"', '', spool_icon_svg)
+    def __init__(self, lane, unit):
+        self.lane = lane
+        self.unit = unit
+        self.started = None
+        self.finished = None
+        self.outcome = "pending"  # pending, running, ok, warning, failed, skipped
+        self.detail = ""
+        self.start_status = None
+
+    @property
+    def duration(self):
+        if self.started is None:
+            return None
+        return (self.finished or time.monotonic()) - self.started
+
+
+class RollingHistogram:
+    """
+    Fixed-bin histogram over the most recent ``window`` samples.
+    """
+
+    def __init__(self, bin_width=TOOLCHANGE_BIN_WIDTH, bins=TOOLCHANGE_BINS, window=TOOLCHANGE_WINDOW):
+        self.bin_width = bin_width
+        self.counts = [0] * bins
+        self.samples = deque(maxlen=window)
+        self.total = 0.0
+
+    def __len__(self):
+        return len(self.samples)
+
+    def _bin(self, value):
+        return min(len(self.counts) - 1, max(0, int(value / self.bin_width)))
+
+    def add(self, value):
+        if len(self.samples) == self.samples.maxlen:
+            oldest = self.samples[0]
+            self.counts[self._bin(oldest)] -= 1
+            self.total -= oldest
+        self.samples.append(value)
+        self.counts[self._bin(value)] += 1
+        self.total += value
+
+    def mean(self):
+        return self.total / len(self.samples) if self.samples else None
+
+    def percentile(self, pct):
+        """
+        Return the upper edge of the bin holding the ``pct`` percentile.
+        """
+        if not self.samples:
+            return None
+        target = max(1, math.ceil(pct / 100 * len(self.samples)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                if index == len(self.counts) - 1:
+                    return max(self.samples)
+                return (index + 1) * self.bin_width
+        return max(self.samples)
+
+
+class ToolchangeTracker:
+    """
+    Derive unload, load and total toolchange durations from lane status transitions.
+
+    Durations are kept in rolling histograms per lane, per extruder and overall,
+    keyed by ``(scope, name, kind)`` with kind one of unload, load or toolchange.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self._unload_started = {}  # lane -> time
+        self._load_started = {}  # lane -> time
+        self._change_started = {}  # extruder -> time the toolchange began
+        self._unload_finished = {}  # extruder -> time the last unload finished
+
+    def active(self):
+        """
+        Yield (lane, kind, started) for every load or unload in progress.
+        """
+        for lane, started in self._unload_started.items():
+            yield lane, "unload", started
+        for lane, started in self._load_started.items():
+            yield lane, "load", started
+
+    def histogram(self, scope, name, kind):
+        key = (scope, name, kind)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = RollingHistogram()
+        return histogram
+
+    def _record(self, lane, extruder, kind, duration):
+        self.histogram("lane", lane, kind).add(duration)
+        # Lanes without an extruder report None, which would not sort with names
+        self.histogram("extruder", extruder or "", kind).add(duration)
+        self.histogram("all", "all", kind).add(duration)
+        return kind, lane, duration
+
+    def transition(self, lane, extruder, old_status, new_status, timestamp=None):
+        """
+        Feed a lane status transition.
 
-            # Determine fill color or transparency
-            if weight == 0:
-                fill_style = 'fill: transparent'
+        :return: List of (kind, lane, duration) measurements it completed.
+        """
+        now = time.monotonic() if timestamp is None else timestamp
+        completed = []
+
+        if old_status == UNLOADING and new_status != UNLOADING:
+            started = self._unload_started.pop(lane, None)
+            if started is not None:
+                completed.append(self._record(lane, extruder, "unload", now - started))
+                self._unload_finished[extruder] = now
+
+        if old_status == LOADING and new_status != LOADING:
+            started = self._load_started.pop(lane, None)
+            change_started = self._change_started.pop(extruder, None)
+            if started is not None and new_status in (TOOLED, TOOL_LOADED):
+                completed.append(self._record(lane, extruder, "load", now - started))
+                if change_started is not None:
+                    completed.append(self._record(lane, extruder, "toolchange", now - change_started))
+
+        if new_status == UNLOADING and old_status != UNLOADING:
+            self._unload_started[lane] = now
+            self._change_started[extruder] = now
+            self._unload_finished.pop(extruder, None)
+        elif new_status == LOADING and old_status != LOADING:
+            self._load_started[lane] = now
+            unload_finished = self._unload_finished.pop(extruder, None)
+            if (extruder not in self._change_started
+                    or (unload_finished is not None and now - unload_finished > TOOLCHANGE_MAX_GAP)):
+                self._change_started[extruder] = now
+
+        return completed
+
+
+class PanelLog:
+    """
+    Category-levelled logging with lazy %-formatting and per-key aggregation.
+
+    Messages use logging's %-style arguments so nothing is formatted unless the
+    message is actually emitted.
+    """
+
+    def __init__(self):
+        self.levels = dict(LOG_CATEGORY_LEVELS)
+        self.debug_enabled = False
+        self._aggregates = {}  # (category, key) -> [window start, suppressed count, last msg, last args, level]
+
+    def configure(self, levels="", debug=False):
+        """
+        :param levels: Comma separated ``category=level`` overrides.
+        :param debug: Enable debug output and verbose dumps everywhere.
+        """
+        self.debug_enabled = debug
+        for item in filter(None, (part.strip() for part in levels.split(","))):
+            category, _sep, level = item.partition("=")
+            value = logging.getLevelName(level.strip().upper())
+            if isinstance(value, int):
+                self.levels[category.strip()] = value
             else:
-                color = self.color or "#000000B3"
-                fill_style = f'fill: {color}'
-
-            # Replace style in filament_base and apply transform
-            spool_icon_svg = re.sub(
-                r'(<path[^>]+id="filament_base"[^>]+)style="[^"]+"',
-                rf'\1style="{fill_style}"',
-                spool_icon_svg
-            )
-            spool_icon_svg = re.sub(
-                r'(<path[^>]+id="filament_base"[^>]*?/?>)',
-                rf'{transform_group}\1</g>',
-                spool_icon_svg
-            )
+                logging.warning(f"Ignoring invalid AFC log level '{item}'")
 
-            # Add xmlns if missing
-            if "<svg" in spool_icon_svg and "xmlns=" not in spool_icon_svg:
-                spool_icon_svg = spool_icon_svg.replace(
-                    "<svg", "<svg xmlns='http://www.w3.org/2000/svg'", 1
-                )
+    def enabled(self, category, level):
+        if not self.debug_enabled and level < self.levels.get(category, logging.INFO):
+            return False
+        return logging.getLogger().isEnabledFor(level)
+
+    def log(self, category, level, msg, *args):
+        if self.enabled(category, level):
+            logging.log(level, msg, *args)
+
+    def info(self, category, msg, *args):
+        self.log(category, logging.INFO, msg, *args)
+
+    def debug(self, category, msg, *args):
+        self.log(category, logging.DEBUG, msg, *args)
+
+    def dump(self, category, msg, *args):
+        """
+        Log a verbose dump, only when the debug switch is on.
+        """
+        if self.debug_enabled:
+            logging.log(logging.INFO, msg, *args)
+
+    def aggregate(self, category, key, msg, *args, level=logging.INFO):
+        """
+        Log the first message for ``key`` in each window and count the rest,
+        emitting a summary with the last suppressed message once the window ends.
+        """
+        if not self.enabled(category, level):
+            return
+        now = time.monotonic()
+        entry = self._aggregates.get((category, key))
+        if entry is not None and now - entry[0] < LOG_AGGREGATE_WINDOW:
+            entry[1] += 1
+            entry[2], entry[3] = msg, args
+            return
+        if entry is not None:
+            self._summarize(key, entry, now)
+        logging.log(level, msg, *args)
+        self._aggregates[(category, key)] = [now, 0, None, None, level]
+
+    def _summarize(self, key, entry, now):
+        started, count, msg, args, level = entry
+        if count:
+            logging.log(level, "%s: %d more in %.0f s, last: " + msg, key, count, now - started, *args)
+
+    def flush(self):
+        now = time.monotonic()
+        for (_category, key), entry in self._aggregates.items():
+            self._summarize(key, entry, now)
+        self._aggregates.clear()
+
+
+panel_log = PanelLog()
+panel_log.configure(os.environ.get("AFC_PANEL_LOG_LEVELS", ""), os.environ.get("AFC_PANEL_DEBUG") == "1")
 
-            loader = GdkPixbuf.PixbufLoader()
-            try:
-                loader.write(spool_icon_svg.encode())
-                loader.close()
-                pixbuf = loader.get_pixbuf()
-                self._icon = pixbuf.scale_simple(width, height, GdkPixbuf.InterpType.BILINEAR)
-            except GLib.Error as e:
-                logging.error(f"Failed to load SVG: {e}")
-                self._icon = None
-        return self._icon
 
+class TraceRecorder:
+    """
+    Bounded buffer of Chrome trace events (complete, instant and async events, in µs).
 
+    Events are held as compact ``(ph, name, cat, ts, extra, args)`` tuples, where
+    extra is the duration or async id, and only become trace-event dicts on export.
+    """
+
+    def __init__(self, max_events=TRACE_MAX_EVENTS):
+        self.events = deque(maxlen=max_events)
+        self.pid = os.getpid()
+        self._async_ids = 0
+
+    @staticmethod
+    def now():
+        return time.monotonic() * 1e6
+
+    def complete(self, name, category, started, **args):
+        """
+        Record a span that began at ``started`` (from ``now()``) and ends now.
+        """
+        self.events.append(("X", name, category, started, self.now() - started, args or None))
+
+    def instant(self, name, category, **args):
+        self.events.append(("i", name, category, self.now(), None, args or None))
+
+    def async_begin(self, name, category, **args):
+        """
+        Start an async span, for work that overlaps other spans such as G-code round trips.
+
+        :return: Id to pass to ``async_end``.
+        """
+        self._async_ids += 1
+        self.events.append(("b", name, category, self.now(), self._async_ids, args or None))
+        return self._async_ids
+
+    def async_end(self, name, category, async_id, **args):
+        self.events.append(("e", name, category, self.now(), async_id, args or None))
+
+    @contextmanager
+    def span(self, name, category, **args):
+        started = self.now()
+        try:
+            yield
+        finally:
+            self.complete(name, category, started, **args)
+
+    def export(self, path):
+        """
+        Write the buffered events as a Chrome trace-event JSON file.
+        """
+        events = []
+        for phase, name, category, timestamp, extra, args in list(self.events):
+            event = {"name": name, "cat": category, "ph": phase, "ts": timestamp,
+                     "pid": self.pid, "tid": 1, "args": args or {}}
+            if phase == "X":
+                event["dur"] = extra
+            elif phase == "i":
+                event["s"] = "t"
+            else:
+                event["id"] = extra
+            events.append(event)
+        with open(path, "w") as handle:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, handle)
+        return len(events)
+
+
+trace_recorder = TraceRecorder()
+
+
+def traced(category, name=None):
+    """
+    Decorator recording each call of the function as a trace span.
+    """
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with trace_recorder.span(span_name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class StallDetector:
+    """
+    Measure GLib main loop latency with a heartbeat timer.
+
+    Panel callbacks run inside ``track``; when a heartbeat arrives late the stall
+    is attributed to the longest tracked callback since the previous beat.
+    """
+
+    def __init__(self, interval_ms=STALL_HEARTBEAT_MS, budget_ms=STALL_BUDGET_MS):
+        self.interval_ms = interval_ms
+        self.budget_ms = budget_ms
+        self.timer = None
+        self.last_beat = None
+        self.longest = None  # (name, ms) of the longest tracked callback since the last beat
+        self.stalls = 0
+        self.worst_ms = 0.0
+        self.offenders = {}  # name -> [stalls, worst ms, total ms]
+        self.recent = deque(maxlen=STALL_RECENT)  # (wall time, latency ms, culprit)
+
+    def start(self):
+        if self.timer is None:
+            self.last_beat = time.monotonic()
+            self.longest = None
+            self.timer = GLib.timeout_add(self.interval_ms, self._beat)
+
+    def stop(self):
+        if self.timer is not None:
+            GLib.source_remove(self.timer)
+            self.timer = None
+
+    def set_interval(self, interval_ms):
+        """
+        Change the heartbeat interval, restarting the timer if it is running.
+        """
+        if interval_ms == self.interval_ms:
+            return
+        self.interval_ms = interval_ms
+        if self.timer is not None:
+            self.stop()
+            self.start()
+
+    @contextmanager
+    def track(self, name):
+        """
+        Time a panel callback so stalls can be attributed to it.
+        """
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = (time.monotonic() - started) * 1000
+            if self.longest is None or elapsed > self.longest[1]:
+                self.longest = (name, elapsed)
+
+    def wrap(self, name, func):
+        """
+        Return ``func`` wrapped in ``track(name)``, for closures handed to GLib.
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.track(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def _beat(self):
+        now = time.monotonic()
+        latency = (now - self.last_beat) * 1000 - self.interval_ms
+        self.last_beat = now
+        longest, self.longest = self.longest, None
+        if latency > self.budget_ms:
+            self._record_stall(latency, longest)
+        return True
+
+    def _record_stall(self, latency, longest):
+        # Only blame a panel callback that accounts for a good part of the stall
+        if longest is not None and longest[1] >= latency / 2:
+            culprit = longest[0]
+        else:
+            culprit = "outside panel"
+        trace_recorder.instant("main loop stall", "stall", latency_ms=latency, culprit=culprit)
+        self.stalls += 1
+        self.worst_ms = max(self.worst_ms, latency)
+        stats = self.offenders.setdefault(culprit, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] = max(stats[1], latency)
+        stats[2] += latency
+        self.recent.append((time.time(), latency, culprit))
+        if longest is not None:
+            logging.warning(f"AFC main loop stalled {latency:.0f}ms, "
+                            f"longest panel callback {longest[0]} ({longest[1]:.0f}ms)")
+        else:
+            logging.warning(f"AFC main loop stalled {latency:.0f}ms outside panel callbacks")
+
+    def worst_offenders(self, count=5):
+        return sorted(self.offenders.items(), key=lambda item: item[1][1], reverse=True)[:count]
+
+
+def stall_tracked(name):
+    """
+    Decorator running a Panel method inside ``self.stall_detector.track(name)``.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.stall_detector.track(name):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TrafficMeter:
+    """
+    Counters kept in per-second bucket rings, summed over trailing windows.
+    """
+
+    def __init__(self, seconds=max(TRAFFIC_WINDOWS)):
+        self.seconds = seconds
+        self.buckets = {}  # key -> array of per-second counts, indexed by second % seconds
+        self.totals = {}
+        self.current = int(time.monotonic())
+
+    def _advance(self, now):
+        second = int(now)
+        if second <= self.current:
+            return
+        # Zero the slots for the seconds skipped since the last call
+        for skipped in range(self.current + 1, min(second, self.current + self.seconds) + 1):
+            slot = skipped % self.seconds
+            for ring in self.buckets.values():
+                ring[slot] = 0
+        self.current = second
+
+    def add(self, key, amount=1, now=None):
+        self._advance(time.monotonic() if now is None else now)
+        ring = self.buckets.get(key)
+        if ring is None:
+            ring = self.buckets[key] = array("d", bytes(8 * self.seconds))
+        ring[self.current % self.seconds] += amount
+        self.totals[key] = self.totals.get(key, 0) + amount
+
+    def rate(self, key, window, now=None):
+        """
+        Average per second of ``key`` over the last ``window`` seconds.
+        """
+        self._advance(time.monotonic() if now is None else now)
+        ring = self.buckets.get(key)
+        if ring is None:
+            return 0.0
+        window = min(window, self.seconds)
+        total = sum(ring[(self.current - offset) % self.seconds] for offset in range(window))
+        return total / window
+
+
+class LaneTimingLog:
+    """
+    Append-only log of per-lane load/unload durations with drift detection.
+
+    Each line is ``<epoch> <lane> <kind> <seconds>``. Only the last
+    LANE_TIMING_KEEP samples per lane and kind are kept in memory, and the file
+    is compacted down to those once it grows past LANE_TIMING_COMPACT_LINES and
+    to at least twice their count, so a compaction always frees room for new lines.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.samples = {}  # (lane, kind) -> deque of (epoch, duration)
+        self.lines = 0
+
+    def load(self):
+        try:
+            with open(self.path) as handle:
+                for line in handle:
+                    parts = line.split()
+                    if len(parts) != 4:
+                        continue
+                    try:
+                        timestamp, duration = int(parts[0]), float(parts[3])
+                    except ValueError:
+                        continue
+                    self._add(timestamp, parts[1], parts[2], duration)
+                    self.lines += 1
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logging.warning(f"Could not read lane timing log {self.path}: {e}")
+            return
+        if self._needs_compaction():
+            self.compact()
+
+    def _add(self, timestamp, lane, kind, duration):
+        key = (lane, kind)
+        samples = self.samples.get(key)
+        if samples is None:
+            samples = self.samples[key] = deque(maxlen=LANE_TIMING_KEEP)
+        samples.append((timestamp, duration))
+
+    def record(self, lane, kind, duration, timestamp=None):
+        """
+        Add a measurement and append it to the log file.
+        """
+        timestamp = int(timestamp or time.time())
+        self._add(timestamp, lane, kind, duration)
+        line = f"{timestamp} {lane} {kind} {duration:.2f}\n"
+        try:
+            with open(self.path, "a") as handle:
+                handle.write(line)
+        except OSError as e:
+            logging.warning(f"Could not write lane timing log {self.path}: {e}")
+            return
+        self.lines += 1
+        if self._needs_compaction():
+            self.compact()
+
+    def _needs_compaction(self):
+        kept = sum(len(samples) for samples in self.samples.values())
+        return self.lines > max(LANE_TIMING_COMPACT_LINES, 2 * kept)
+
+    def compact(self):
+        """
+        Rewrite the file with only the samples still kept in memory.
+        """
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as handle:
+                for (lane, kind), samples in self.samples.items():
+                    for timestamp, duration in samples:
+                        handle.write(f"{timestamp} {lane} {kind} {duration:.2f}\n")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Could not compact lane timing log {self.path}: {e}")
+            return
+        self.lines = sum(len(samples) for samples in self.samples.values())
+
+    def durations(self, lane, kind):
+        return [duration for _, duration in self.samples.get((lane, kind), ())]
+
+    def baseline(self, lane, kind):
+        """
+        Median of the samples older than the recent window, or None if too few.
+        """
+        samples = self.durations(lane, kind)[:-LANE_TIMING_RECENT]
+        if len(samples) < LANE_TIMING_MIN_BASELINE:
+            return None
+        return statistics.median(samples)
+
+    def drift(self, lane, kind):
+        """
+        Ratio of the recent median to the baseline, or None without a baseline.
+        """
+        baseline = self.baseline(lane, kind)
+        if not baseline:
+            return None
+        recent = self.durations(lane, kind)[-LANE_TIMING_RECENT:]
+        return statistics.median(recent) / baseline
+
+    def drifting(self, lane):
+        """
+        Return {kind: ratio} for the lane's timings beyond LANE_TIMING_DRIFT.
+        """
+        result = {}
+        for kind in ("load", "unload"):
+            ratio = self.drift(lane, kind)
+            if ratio is not None and ratio > LANE_TIMING_DRIFT:
+                result[kind] = ratio
+        return result
+
+
+class AFCHistory:
+    """
+    Fixed-memory ring buffer of applied AFC state deltas.
+
+    Each entry is a small tuple ``(timestamp, key_id, value)`` where ``key_id``
+    indexes an interned ``(kind, name, field)`` key. Entries pushed out of the
+    ring are folded into a baseline snapshot so any point inside the retained
+    window can still be reconstructed.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, max_entries=HISTORY_MAX_ENTRIES):
+        self._entries = deque(maxlen=max_entries)
+        self._keys = []  # key_id -> (kind, name, field)
+        self._key_ids = {}  # (kind, name, field) -> key_id
+        self._baseline = {}  # key_id -> value before the oldest retained entry
+        self._current = {}  # key_id -> latest recorded value
+        self.recorded = 0  # Total deltas ever recorded
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _key_id(self, kind, name, field):
+        key = (kind, name, field)
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            key_id = len(self._keys)
+            self._keys.append((sys.intern(kind), sys.intern(name), sys.intern(field)))
+            self._key_ids[key] = key_id
+        return key_id
+
+    @staticmethod
+    def _compact(value):
+        if isinstance(value, str):
+            return sys.intern(value)
+        return value
+
+    def seed(self, kind, name, field, value):
+        """
+        Record an initial value without creating a delta entry.
+        """
+        key_id = self._key_id(kind, name, field)
+        value = self._compact(value)
+        self._baseline[key_id] = value
+        self._current[key_id] = value
+
+    def record(self, kind, name, field, value, timestamp=None):
+        """
+        Record a delta if the value differs from the last recorded one.
+
+        :return: True if a delta was stored.
+        """
+        key_id = self._key_id(kind, name, field)
+        if self._current.get(key_id, self._MISSING) == value:
+            return False
+        value = self._compact(value)
+        if len(self._entries) == self._entries.maxlen:
+            _, old_key_id, old_value = self._entries[0]
+            self._baseline[old_key_id] = old_value
+        self._entries.append((time.monotonic() if timestamp is None else timestamp, key_id, value))
+        self._current[key_id] = value
+        self.recorded += 1
+        return True
+
+    def span(self):
+        """
+        Return the (oldest, newest) timestamps held, or (None, None) if empty.
+        """
+        if not self._entries:
+            return None, None
+        return self._entries[0][0], self._entries[-1][0]
+
+    def state_at(self, timestamp):
+        """
+        Rebuild the state as it was at ``timestamp``.
+
+        :return: Nested dict ``{kind: {name: {field: value}}}``.
+        """
+        values = dict(self._baseline)
+        for entry_time, key_id, value in self._entries:
+            if entry_time > timestamp:
+                break
+            values[key_id] = value
+        state = {}
+        for key_id, value in values.items():
+            kind, name, field = self._keys[key_id]
+            state.setdefault(kind, {}).setdefault(name, {})[field] = value
+        return state
+
+    def names_since(self, recorded):
+        """
+        Return the names of the entities changed by the deltas recorded after ``recorded``.
+
+        :param recorded: Earlier value of ``self.recorded``.
+        """
+        names = set()
+        entries = reversed(self._entries)
+        for _ in range(min(self.recorded - recorded, len(self._entries))):
+            names.add(self._keys[next(entries)[1]][1])
+        return names
+
+    def changes_between(self, start, end):
+        """
+        Return the deltas recorded in ``(start, end]`` as (timestamp, kind, name, field, value).
+        """
+        return [
+            (entry_time, *self._keys[key_id], value)
+            for entry_time, key_id, value in self._entries
+            if start < entry_time <= end
+        ]
+
+
+class SharedPanelState:
+    """
+    AFC data and trackers kept across Panel instances for the life of the
+    KlipperScreen process, so reopening the panel from either menu entry does
+    not repeat the bootstrap requests or lose accumulated history.
+
+    Cleared when Klipper disconnects, shuts down or becomes ready again, since
+    units, lanes and sensors may differ after a restart.
+    """
+
+    def __init__(self):
+        self.generation = 0
+        self.timing_log = None  # Backed by a file, so it survives clear()
+        self.lane_columns = {}  # (screen width, height) -> lane grid columns, survives clear()
+        self.paged_units = None  # User's paged mode choice, None for automatic
+        self.visible_unit = None  # Unit shown in paged mode
+        self.clear()
+
+    def clear(self):
+        self.generation += 1
+        self.afc_data = None  # Last AFC status payload
+        self.filament_sensors = None
+        self.history = AFCHistory()
+        self.telemetry = {}  # Lane name -> LaneTelemetry
+        self.toolchange_tracker = ToolchangeTracker()
+        self.traffic = TrafficMeter()
+        self.sensor_status = None  # Last filament sensor query result
+
+
+shared_state = SharedPanelState()
+spool_icon_cache = SpoolIconCache()
 
 
 class Panel(ScreenPanel):
@@ -211,8 +1882,10 @@ class Panel(ScreenPanel):
     lane_widgets: dict
 
     def __init__(self, screen, title):
+        init_started = time.perf_counter()
         title = title or ("AFC Status")
         super().__init__(screen, title)
+        ensure_panel_resources()
         self.apiClient = screen.apiclient
         self.lane_widgets = {}
         AFClane.theme_path = screen.theme
@@ -222,21 +1895,45 @@ class Panel(ScreenPanel):
             klipperscreendir, "afc_icons")
         self.theme_path = os.path.join(
             klipperscreendir, "styles", AFClane.theme_path, "style.css")
+        self.state_generation = None
+        self.rebuild_id = None
 
+        self.bootstrap()
+
+        self._first_draw_handler = self.content.connect_after("draw", self.on_first_draw, init_started)
+        # Capture-phase gesture so presses on any child pause the prewarm
+        self.input_gesture = Gtk.GestureMultiPress.new(self.content)
+        self.input_gesture.set_propagation_phase(Gtk.PropagationPhase.CAPTURE)
+        self.input_gesture.connect("pressed", self.note_activity)
+
+    def bootstrap(self):
+        """
+        Build the panel from the shared AFC state, fetching it first if it is not warm.
+        """
         # Control for the update of the UI
         self.update_info = False
 
         self._pending_lane_grid_updates = {}
+        self.lane_widgets = {}
 
-        result = self.apiClient.post_request("printer/afc/status", json={})
-        if not isinstance(result, dict):
-            logging.error(f"API call failed or returned invalid data: {result}")
-            # Optionally show a user-friendly error or retry
-            # Remove this panel and go back to the previous one
-            return
+        bootstrap_started = time.perf_counter()
+        generation = shared_state.generation
+        # Built from cached data: refresh on the first activate()
+        self.stale = shared_state.afc_data is not None
+        if self.stale:
+            afc_data = shared_state.afc_data
+        else:
+            result = self.apiClient.post_request("printer/afc/status", json={})
+            if not isinstance(result, dict):
+                logging.error(f"API call failed or returned invalid data: {result}")
+                # Optionally show a user-friendly error or retry
+                # Remove this panel and go back to the previous one
+                return
 
-        afc_data = result.get('result', {}).get('status:', {}).get('AFC', {})
-        logging.info(f"AFC Data Extracted: {afc_data}")
+            afc_data = result.get('result', {}).get('status:', {}).get('AFC', {})
+            shared_state.afc_data = afc_data
+        self.state_generation = generation
+        panel_log.dump("init", "AFC Data Extracted: %s", afc_data)
 
         self.reset_ui()
 
@@ -244,6 +1941,7 @@ class Panel(ScreenPanel):
         self.afc_unit_names = []
         self.afc_lane_data = []
         self.afc_lanes = []
+        self.lane_by_name = {}
         self.afc_system = None
         self.current_load = None
         self.spoolman = None
@@ -252,6 +1950,41 @@ class Panel(ScreenPanel):
         self.action_buttons = {}
         self.move_lane = None
         self.distance = 5
+        self.jog_pending = 0  # Signed distance tapped but not yet sent
+        self.jog_timer = None
+        self.jog_hold_timer = None
+        self.jog_hold_direction = 0
+        self.jog_hold_total = 0
+        self.jog_holding = False
+        self.jog_hold_started = False  # Held past the delay; cleared only on release
+        self.select_mode = False  # Multi-select on the lane grid
+        self.selected_lanes = []  # Lane names in the order they were selected
+        self.bulk_spool_lanes = []  # Lanes the spool editor applies to in bulk mode
+        self.bulk_operation = None  # Progress of the running bulk action
+        self.bulk_timer = None  # Gives up on lanes that never settle
+        self.lane_tests = []  # LaneTestRun per lane of the last "Test all" run
+        self.toolchange_tracker = shared_state.toolchange_tracker
+        if shared_state.timing_log is None:
+            shared_state.timing_log = LaneTimingLog(
+                os.path.join(get_config_dir(self._screen._config), LANE_TIMING_FILE))
+            shared_state.timing_log.load()
+        self.timing_log = shared_state.timing_log
+        self.watchdog_timer = None
+        self.watchdog_alerted = set()  # (lane, kind) already alerted for the current operation
+        self.stall_detector = StallDetector()
+        self.diagnostics_timer = None
+        self.lanes_to_fill = deque()  # Lanes still showing a skeleton card
+        self.unfilled_lanes = set()
+        self.lane_fill_id = None
+        self.lazy_popovers = {}  # key -> (popover, builder) not built yet
+        self.buttons_enabled = False
+        self.prewarm_jobs = deque()
+        self.prewarm_id = None
+        self.last_activity = 0.0  # Monotonic time of the last user input or status update
+        self.tracemalloc_snapshot = None
+        self.tracemalloc_diff = []
+        self.traffic = shared_state.traffic
+        self.lane_test_running = None
         self.last_drop_time = datetime.now()
         self.hub_states = {}  # Track the current state of each hub
         self.selected_lane = None
@@ -262,15 +1995,27 @@ class Panel(ScreenPanel):
         self.start_sensor_polling()  # Start periodic sensor polling
         self.virtual_bypass = False
         self.led_state = False  # Track the AFC LED state
-
-        self.data = self.apiClient.post_request("printer/objects/list", json={})
-        sensor_data = self.data.get('result', {}).get('objects', {})
-        self.filament_sensors = [
-            name for name in sensor_data
-            if name.startswith("filament_switch_sensor")
-        ]
-
-        self.sensors = self.fetch_sensor_data()
+        self.history = shared_state.history  # Ring buffer of applied state deltas
+        self.command_queue = AFCCommandQueue(self._screen._ws.klippy.gcode_script, self.update_command_queue_label)
+        self.optimistic = OptimisticUpdates()  # Setting changes awaiting confirmation
+        self.optimistic_timer = None
+        self.telemetry = shared_state.telemetry  # Lane name -> LaneTelemetry
+        self.telemetry_lane = None  # Lane shown in the telemetry detail view
+        self.telemetry_window = TELEMETRY_WINDOWS[1][1]
+
+        if shared_state.filament_sensors is None:
+            self.data = self.apiClient.post_request("printer/objects/list", json={})
+            sensor_data = self.data.get('result', {}).get('objects', {})
+            shared_state.filament_sensors = [
+                name for name in sensor_data
+                if name.startswith("filament_switch_sensor")
+            ]
+        self.filament_sensors = shared_state.filament_sensors
+
+        if self.stale and shared_state.sensor_status is not None:
+            self.sensors = shared_state.sensor_status  # Polling refreshes it once active
+        else:
+            self.sensors = self.fetch_sensor_data()
 
         for unit_name, unit_data in afc_data.items():
             if unit_name == "system":
@@ -287,16 +2032,16 @@ class Panel(ScreenPanel):
                 logging.warning(f"Unexpected unit_data format for {unit_name}: {unit_data}")
                 continue
 
-            logging.info(f"Processing unit: {unit_name}")
+            panel_log.debug("init", "Processing unit: %s", unit_name)
             unit_lanes = []
 
             system_type = unit_data.get("system", {}).get("type", "Unknown")
 
             for lane_name, lane_data in unit_data.items():
-                logging.info(f"Checking lane: {lane_name}")
+                panel_log.debug("init", "Checking lane: %s", lane_name)
 
                 if not isinstance(lane_data, dict) or not lane_name.startswith("lane"):
-                    logging.info(f"Skipping non-lane entry: {lane_name}")
+                    panel_log.debug("init", "Skipping non-lane entry: %s", lane_name)
                     continue
 
                 lane_obj = AFClane(
@@ -305,23 +2050,86 @@ class Panel(ScreenPanel):
                     lane_data=lane_data
                 )
                 lane_obj.status = self.get_lane_status(lane_obj)
-                logging.info(f"lane status {lane_obj.status}")
+                panel_log.debug("init", "lane %s status %s", lane_name, lane_obj.status)
  
+                self.telemetry.setdefault(lane_name, LaneTelemetry()).sample(lane_obj)
+
                 unit_lanes.append(lane_obj)
                 self.afc_lane_data.append(lane_obj)
+                self.lane_by_name[lane_name] = lane_obj
                 self.afc_lanes.append(lane_obj.name)
 
             unit_obj = AFCunit(name=unit_name, lanes=unit_lanes, system_type=system_type)
             self.afc_units.append(unit_obj)
             self.afc_unit_names.append(unit_obj.name)
 
-        logging.info(f"Final AFC Lanes: {self.afc_lane_data}")
-        logging.info(f"Unit names: {self.afc_unit_names}")
-        logging.info(f"lane names: {self.afc_lanes}")
+        panel_log.dump("init", "Final AFC Lanes: %s", self.afc_lane_data)
+        panel_log.info("init", "Units: %s, lanes: %s", self.afc_unit_names, self.afc_lanes)
+
+        self.seed_history()
+        STARTUP_PROFILE["bootstrap"] = time.perf_counter() - bootstrap_started
 
+        layout_started = time.perf_counter()
         self.init_layout()
         self.sensor_layout()
         self.create_spool_layout()
+        STARTUP_PROFILE["layout"] = time.perf_counter() - layout_started
+
+    def current_layout(self):
+        """
+        Return the units and lanes this panel was built with, in the form afc_layout returns.
+        """
+        return tuple((unit.name, tuple(lane.name for lane in unit.lanes)) for unit in self.afc_units)
+
+    def rebuild(self):
+        """
+        Tear down timers and widgets and bootstrap again, after Klipper restarted.
+        """
+        self.rebuild_id = None
+        logging.info("AFC configuration may have changed, rebuilding panel")
+        was_active = self.update_info
+        self.stop_panel_timers()
+        for child in self.content.get_children():
+            self.content.remove(child)
+        self.bootstrap()
+        self.content.show_all()
+        if was_active and self.state_generation == shared_state.generation:
+            self.activate()
+        return False
+
+    def stop_panel_timers(self):
+        """
+        Remove every GLib source this panel instance owns.
+        """
+        if not hasattr(self, "stall_detector"):
+            return  # A failed bootstrap never started any
+        self.stop_sensor_polling()
+        self.stall_detector.stop()
+        self.stall_detector.set_interval(STALL_HEARTBEAT_MS)
+        self.cancel_jog(None)
+        self.prewarm_jobs.clear()
+        for name in ("optimistic_timer", "watchdog_timer", "diagnostics_timer", "prewarm_id", "reflow_id",
+                     "bulk_timer"):
+            source = getattr(self, name, None)
+            if source is not None:
+                GLib.source_remove(source)
+                setattr(self, name, None)
+        for source in self._pending_lane_grid_updates.values():
+            GLib.source_remove(source)
+        self._pending_lane_grid_updates.clear()
+        if self.lane_fill_id is not None:
+            GLib.source_remove(self.lane_fill_id)
+            self.lane_fill_id = None
+
+    def on_first_draw(self, widget, cr, init_started):
+        """
+        Record the time from construction to the first paint and log the startup profile.
+        """
+        widget.disconnect(self._first_draw_handler)
+        STARTUP_PROFILE["first_paint"] = time.perf_counter() - init_started
+        panel_log.info("init", "AFC startup: %s",
+                       ", ".join(f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in STARTUP_PROFILE.items()))
+        return False
     
     def get_afc_lanes(self):
         """
@@ -329,31 +2137,36 @@ class Panel(ScreenPanel):
         """
         return self.afc_lanes
         
+    @stall_tracked("process_update")
     def process_update(self, action, data):
         """
         Process the update from the printer.
         """
-        if self.update_info == False:
+        self.traffic.add(f"action:{action}")
+        # Serializing the payload is only worth it while someone is watching the meter
+        if self.diagnostics_timer is not None:
+            self.traffic.add("bytes", len(data) if isinstance(data, str) else len(json.dumps(data, default=str)))
+
+        if action in KLIPPY_STATE_ACTIONS:
+            shared_state.clear()
+            if action != "notify_klippy_shutdown":
+                # Replies to commands sent before a disconnect or restart never arrive
+                self.command_queue.clear(action)
+            if action == "notify_klippy_ready" and self.update_info and self.rebuild_id is None:
+                self.rebuild_id = GLib.idle_add(self.rebuild)
             return
 
-        api_data = self.apiClient.post_request("printer/afc/status", json={})
-        if not isinstance(api_data, dict):
-            logging.error(f"API call failed or returned invalid data: {api_data}")
-            self.update_info = False
-            self._screen.show_popup_message(_("AFC panel could not be loaded.\nCheck your printer configuration."))
-            self._screen._remove_current_panel()
-            self._screen._menu_go_back()  # Go back to main menu or previous panel
+        if self.update_info == False:
+            self.traffic.add("noop")
             return
 
-        afc_data = api_data.get('result', {}).get('status:', {}).get('AFC', {})
-        if afc_data:
-            self.update_ui(afc_data)
-        else:
-            logging.error("No AFC data found in the API response.")
-            self.update_info = False
+        if not self.refresh_afc_status(action):
             return
 
         if action == "notify_gcode_response":
+            if self.lane_test_running is not None and isinstance(data, str) and data.startswith("!!"):
+                self.lane_test_running.outcome = "failed"
+                self.lane_test_running.detail = data.lstrip("! ").strip()
             if "action:cancel" in data or "action:paused" in data:
                 self.enable_buttons(True)
             elif self._printer.state == "printing":
@@ -364,14 +2177,71 @@ class Panel(ScreenPanel):
         if action != "notify_status_update":
             return
 
+    def refresh_afc_status(self, action=None):
+        """
+        Fetch the AFC status and apply it to the UI incrementally.
+
+        :return: False if the status could not be fetched.
+        """
+        self.traffic.add("rest")
+        with trace_recorder.span("printer/afc/status", "network", action=action):
+            api_data = self.apiClient.post_request("printer/afc/status", json={})
+        if not isinstance(api_data, dict):
+            logging.error(f"API call failed or returned invalid data: {api_data}")
+            self.update_info = False
+            self._screen.show_popup_message(_("AFC panel could not be loaded.\nCheck your printer configuration."))
+            self._screen._remove_current_panel()
+            self._screen._menu_go_back()  # Go back to main menu or previous panel
+            return False
+
+        afc_data = api_data.get('result', {}).get('status:', {}).get('AFC', {})
+        if afc_data and afc_layout(afc_data) != self.current_layout():
+            # Klipper restarted with other units or lanes while another panel was
+            # shown, so the klippy state notifications never reached this one
+            logging.info("AFC units or lanes changed, discarding cached panel state")
+            shared_state.clear()
+            shared_state.afc_data = afc_data
+            if self.rebuild_id is None:
+                self.rebuild_id = GLib.idle_add(self.rebuild)
+            return False
+        if afc_data:
+            shared_state.afc_data = afc_data
+            recorded = self.history.recorded
+            self.update_ui(afc_data)
+            if self.history.recorded != recorded:
+                self.traffic.add("ui_change")
+                self.note_activity()
+                self.command_queue.mark_visible(self.history.names_since(recorded))
+            else:
+                self.traffic.add("noop")
+            self.command_queue.expire()
+            return True
+        logging.error("No AFC data found in the API response.")
+        self.update_info = False
+        return False
+
     def enable_buttons(self, enable):
+        self.buttons_enabled = enable
         if not hasattr(self, "action_buttons") or not self.action_buttons:
             return
         for button in self.action_buttons:
             self.action_buttons[button].set_sensitive(enable)
 
     def activate(self):
+        if self.state_generation != shared_state.generation:
+            # Klipper restarted since this instance was built
+            self.rebuild()
+            if self.state_generation != shared_state.generation:
+                return
+        elif self.stale:
+            # Reopened: bring the existing widgets up to date instead of rebuilding
+            self.update_info = True
+            if not self.refresh_afc_status("activate"):
+                return
+        self.stale = False
         self.update_info = True
+        self.stall_detector.start()
+        self.take_tracemalloc_snapshot()
         self.start_sensor_polling()  # Start polling when activated
         if hasattr(self, "screen_stack"):
             self.screen_stack.set_visible_child_name("main_grid")
@@ -379,7 +2249,11 @@ class Panel(ScreenPanel):
 
     def deactivate(self):
         self.update_info = False
+        self.stale = True
+        self.stall_detector.stop()
+        panel_log.flush()
         self.stop_sensor_polling()  # Stop polling when deactivated
+        self.cancel_jog(None)
         self.enable_buttons(False)
 
     def start_sensor_polling(self):
@@ -402,6 +2276,7 @@ class Panel(ScreenPanel):
             GLib.source_remove(self.sensor_poll_id)
             self.sensor_poll_id = None
 
+    @stall_tracked("poll_sensors")
     def poll_sensors(self):
         """
         Fetch and update sensor data. Return True to keep polling.
@@ -450,9 +2325,34 @@ class Panel(ScreenPanel):
         self.selector_grid = Gtk.Grid(column_homogeneous=True)
         self.selector_grid.set_vexpand(True)
 
+        # Populated on first use by the matching show_*_grid method
+        self.history_grid = Gtk.Grid(column_homogeneous=True)
+        self.history_grid.set_vexpand(True)
+        self.history_scale = None  # Built on first use by show_history_grid
+
+        self.telemetry_grid = Gtk.Grid(column_homogeneous=True)
+        self.telemetry_grid.set_vexpand(True)
+
+        self.test_results_grid = Gtk.Grid(column_homogeneous=True)
+        self.test_results_grid.set_vexpand(True)
+        self.test_results_table = None  # Built on first use by show_test_results_grid
+
+        self.diagnostics_grid = Gtk.Grid(column_homogeneous=True)
+        self.diagnostics_grid.set_vexpand(True)
+
+        self.extruders_grid = Gtk.Grid(column_homogeneous=True)
+        self.extruders_grid.set_vexpand(True)
+        self.extruder_overview = None  # Built on first use by show_extruders_grid
+        self.extruder_rows = {}  # Extruder name -> labels of its overview row
+
         self.screen_stack.add_named(self.grid, "main_grid")
         self.screen_stack.add_named(self.sensor_grid, "sensor_grid")
         self.screen_stack.add_named(self.selector_grid, "selector_grid")
+        self.screen_stack.add_named(self.history_grid, "history_grid")
+        self.screen_stack.add_named(self.telemetry_grid, "telemetry_grid")
+        self.screen_stack.add_named(self.test_results_grid, "test_results_grid")
+        self.screen_stack.add_named(self.diagnostics_grid, "diagnostics_grid")
+        self.screen_stack.add_named(self.extruders_grid, "extruders_grid")
         
         self.content.add(self.screen_stack)
 
@@ -464,6 +2364,7 @@ class Panel(ScreenPanel):
         for css_class in style_context.list_classes():
             style_context.remove_class(css_class)
 
+    @traced("rebuild")
     def init_layout(self):
         # Extruder Tools
         extruder_container = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
@@ -473,7 +2374,7 @@ class Panel(ScreenPanel):
         extruder_tools.set_hexpand(False)
         extruder_tools.set_vexpand(False)
 
-        current_lane = next((lane for lane in self.afc_lane_data if lane.name == self.current_load), None)
+        current_lane = self.lane_by_name.get(self.current_load)
 
         # Create labels
         extruder_label = Gtk.Label(label=f"Extruder: {current_lane.extruder}" if current_lane else "Extruder: N/A")
@@ -517,128 +2418,383 @@ class Panel(ScreenPanel):
         self.test_grid = self.create_test_grid()
         self.stack.add_named(self.test_grid, "test_grid")
 
+        self.bulk_grid = self.create_bulk_grid()
+        self.stack.add_named(self.bulk_grid, "bulk_grid")
+
         self.grid.attach(self.stack, 0, 2, 4, 1)
 
         logging.info(f"Screen width: {self._screen.width}")
 
+    @traced("rebuild")
     def create_unit_lane_layout(self):
-        unit_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, homogeneous=False, spacing=5)
-        unit_box.set_hexpand(False)
-        unit_box.set_vexpand(False)  # Ensure unit_box does not expand vertically
-        unit_box.set_valign(Gtk.Align.START)
-        
-        for unit in self.afc_units:
-            box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
-            box.set_hexpand(False)
-
-            # Get the icon filename from the mapping
-            icon_filename = SYSTEM_TYPE_ICONS.get(unit.system_type)
-            if icon_filename:
-                try:
-                    pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
-                        filename=os.path.join(self.image_path, icon_filename),
-                        width=45,
-                        height=45,
-                        preserve_aspect_ratio=True
-                    )
+        # Frames share one height without measuring each card
+        self.lane_frame_sizes = Gtk.SizeGroup(mode=Gtk.SizeGroupMode.VERTICAL)
+        self.lane_grids = []  # (lane_grid, lane frames in order)
+        geometry = (self._screen.width, self._screen.height)
+        self.lane_columns = shared_state.lane_columns.get(geometry)
+        if self.lane_columns is None:
+            # Estimate until the lane area is first allocated
+            self.lane_columns = lane_grid_columns(self._screen.width - 150)
+        self.reflow_id = None
+
+        self.paged_units = shared_state.paged_units
+        if self.paged_units is None:
+            self.paged_units = len(self.afc_units) >= PAGED_UNITS_MIN
+        self.unit_pages = {}  # Unit name -> page box, filled on first view
+        self.unit_summaries = {}  # Unit name -> (button, label) in the summary strip
+
+        lane_area = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
+        scroll = self._gtk.ScrolledWindow()
+        # EXTERNAL keeps the grid's minimum width from propagating, so the lane
+        # area can be allocated narrower than the current column count needs
+        scroll.set_policy(Gtk.PolicyType.EXTERNAL, Gtk.PolicyType.AUTOMATIC)
+        scroll.connect("size-allocate", self.on_lane_area_allocated)
+
+        if self.paged_units:
+            lane_area.pack_start(self.create_unit_summary_strip(), False, False, 0)
+            self.unit_stack = Gtk.Stack()
+            self.unit_stack.set_vhomogeneous(False)  # Size to the visible unit only
+            self.unit_stack.set_vexpand(False)
+            self.unit_stack.set_valign(Gtk.Align.START)
+            for unit in self.afc_units:
+                page = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+                self.unit_pages[unit.name] = page
+                self.unit_stack.add_named(page, unit.name)
+            scroll.add(self.unit_stack)
+        else:
+            unit_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, homogeneous=False, spacing=5)
+            unit_box.set_hexpand(False)
+            unit_box.set_vexpand(False)  # Ensure unit_box does not expand vertically
+            unit_box.set_valign(Gtk.Align.START)
+            for unit in self.afc_units:
+                unit_box.pack_start(self.create_unit_section(unit), False, False, 0)
+            scroll.add(unit_box)
+
+        lane_area.pack_start(scroll, True, True, 0)
+        self.lane_area = lane_area
+        self.grid.attach(lane_area, 0, 1, 4, 1)  # Attach unit box to grid
+        self.grid.show_all()
+
+        if self.paged_units and self.afc_units:
+            unit_names = [unit.name for unit in self.afc_units]
+            visible_unit = shared_state.visible_unit
+            if visible_unit not in unit_names:
+                current_lane = self.lane_by_name.get(self.current_load)
+                visible_unit = current_lane.unit if current_lane else unit_names[0]
+            self.show_unit_page(None, visible_unit)
+        self.schedule_lane_fill()
+
+    def create_unit_section(self, unit):
+        """
+        Build one unit's header and lane grid. Lane cards start as skeletons.
+        """
+        box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
+        box.set_hexpand(False)
+
+        # Get the icon filename from the mapping
+        icon_filename = SYSTEM_TYPE_ICONS.get(unit.system_type)
+        if icon_filename:
+            try:
+                scale = min(self.content.get_scale_factor(), 2)
+                pixbuf = load_icon_pixbuf(os.path.join(self.image_path, icon_filename), 45, scale)
+                if scale > 1:
+                    unit_icon = Gtk.Image.new_from_surface(Gdk.cairo_surface_create_from_pixbuf(pixbuf, scale, None))
+                else:
                     unit_icon = Gtk.Image.new_from_pixbuf(pixbuf)
-                    box.pack_start(unit_icon, False, False, 0)
-                except Exception as e:
-                    logging.info(f"Could not load image for {unit.system_type}: {e}")
+                box.pack_start(unit_icon, False, False, 0)
+            except Exception as e:
+                logging.info(f"Could not load image for {unit.system_type}: {e}")
+        else:
+            logging.warning(f"No icon defined for system type: {unit.system_type}")
+
+        # Create a Gtk.Image from the scaled pixbuf
+        unit_name_label = unit.name.replace("_", " ")
+        unit_label = Gtk.Label(label=unit_name_label)
+        box.pack_start(unit_label, False, False, 0)
+        unit_hub = Gtk.Label(label=" | Hub")
+        self.labels[f"{unit.name}_hub"] = unit_hub
+        box.pack_start(unit_hub, False, False, 0)
+
+        # Get the initial state of the hub
+        hub_state = self.afc_system.hubs.get(unit.name).state if self.afc_system and unit.name in self.afc_system.hubs else False
+        # Units built after startup (paged mode) take the state seen since then
+        hub_state = self.hub_states.get(unit.name, hub_state)
+        panel_log.debug("layout", "Hub state for %s: %s", unit.name, hub_state)
+
+        # Create the status dot with the initial state
+        status_dot = Gtk.EventBox()
+        dot = Gtk.Label(label=" ")
+        dot.set_size_request(20, 20)
+        dot.set_valign(Gtk.Align.CENTER)
+        dot.set_halign(Gtk.Align.START)
+        dot.get_style_context().add_class("status-active" if hub_state else "status-empty")
+        status_dot.add(dot)
+
+        # Store the status dot reference for updates
+        self.labels[f"{unit.name}_status_dot"] = dot
+
+        box.pack_start(status_dot, False, False, 0)
+
+        unit_expander = Gtk.Expander()
+        unit_expander.set_label_widget(box)
+        unit_expander.set_halign(False)
+
+        unit_expander.set_expanded(True)  # Open the first expander by default
+        lane_grid = AutoGrid()
+        lane_grid.set_vexpand(False)  # Ensure lane_grid does not expand vertically
+        lane_frames = []
+
+        for j, lane in enumerate(unit.lanes):
+            # Calculate row and column positions dynamically
+            row = j // self.lane_columns
+            col = j % self.lane_columns
+
+            lane_frame = Gtk.Frame()
+            lane_frame.set_size_request(150, 245)  # Set a fixed width for lane frames
+            lane_frame.set_vexpand(False)  # Ensure lane_frame does not expand vertically
+            lane_frame.set_hexpand(False)
+            lane_frame.set_valign(Gtk.Align.START)
+
+            lane_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=0)
+            lane_box.set_hexpand(False)
+            lane_box.get_style_context().add_class("button_active")
+
+            # Cards start as a skeleton and are filled in by fill_lane_cards
+            lane_box.pack_start(self.create_lane_skeleton(lane), True, True, 0)
+            self.lanes_to_fill.append(lane)
+            self.unfilled_lanes.add(lane.name)
+
+            lane_frame.add(lane_box)
+            lane_frame.set_margin_start(5)
+            lane_frame.set_margin_end(5)
+            lane_frame.set_margin_top(2)
+            lane_frame.set_margin_bottom(2)
+
+            # Attach the lane frame to the grid at the calculated position
+            lane_grid.attach(lane_frame, col, row, 1, 1)
+            lane_frames.append(lane_frame)
+            self.lane_frame_sizes.add_widget(lane_frame)
+
+            if lane.name == (self.afc_system.current_load if self.afc_system else self.current_load):
+                lane_frame.get_style_context().add_class("highlighted-lane")
+
+            # Store the lane_box for updating purposes
+            self.lane_widgets[f"{lane.name}_frame"] = lane_frame
+            self.lane_widgets[lane.name] = lane_box
+
+        unit_expander.add(lane_grid)
+        self.lane_grids.append((lane_grid, lane_frames))
+        return unit_expander
+
+    def schedule_lane_fill(self):
+        if self.lane_fill_id is None and self.lanes_to_fill:
+            self.lane_fill_id = GLib.idle_add(self.stall_detector.wrap("fill_lane_cards", self.fill_lane_cards))
+
+    ##################
+    #   Unit pages   #
+    ##################
+
+    def create_unit_summary_strip(self):
+        """
+        Create the row of unit buttons shown in paged mode, each with a live summary.
+        """
+        strip = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
+        strip.set_homogeneous(True)
+        for unit in self.afc_units:
+            label = Gtk.Label()
+            label.set_justify(Gtk.Justification.CENTER)
+            label.set_ellipsize(Pango.EllipsizeMode.END)
+            button = Gtk.Button()
+            button.add(label)
+            button.get_style_context().add_class("color4")
+            button.connect("clicked", self.show_unit_page, unit.name)
+            self.unit_summaries[unit.name] = (button, label)
+            strip.pack_start(button, True, True, 0)
+            self.update_unit_summary(unit)
+        return strip
+
+    def update_unit_summary(self, unit):
+        """
+        Refresh a unit's lane count, loaded/empty split and alert count in the summary strip.
+        """
+        summary = self.unit_summaries.get(unit.name)
+        if not summary:
+            return
+        loaded = sum(1 for lane in unit.lanes if lane.load)  # Prep-only lanes count as alerts
+        alerts = sum(1 for lane in unit.lanes if lane.status in (PREP_NOT_LOAD, LOAD_NOT_PREP))
+        text = (f"{unit.name.replace('_', ' ')}\n"
+                + _("{loaded}/{count} loaded").format(loaded=loaded, count=len(unit.lanes)))
+        if alerts:
+            text += f"  ⚠ {alerts}"
+        label = summary[1]
+        if label.get_label() != text:
+            label.set_label(text)
+
+    def show_unit_page(self, button, unit_name):
+        """
+        Show one unit's lanes in paged mode, building its cards the first time.
+        """
+        page = self.unit_pages.get(unit_name)
+        if page is None:
+            return
+        if not page.get_children():
+            unit = next(unit for unit in self.afc_units if unit.name == unit_name)
+            page.pack_start(self.create_unit_section(unit), False, False, 0)
+            page.show_all()
+            self.schedule_lane_fill()
+        self.unit_stack.set_visible_child_name(unit_name)
+        shared_state.visible_unit = unit_name
+        for name, (unit_button, _label) in self.unit_summaries.items():
+            style = unit_button.get_style_context()
+            if name == unit_name:
+                style.add_class("button_active")
             else:
-                logging.warning(f"No icon defined for system type: {unit.system_type}")
-
-            # Create a Gtk.Image from the scaled pixbuf
-            unit_name_label = unit.name.replace("_", " ")
-            unit_label = Gtk.Label(label=unit_name_label)
-            box.pack_start(unit_label, False, False, 0)
-            unit_hub = Gtk.Label(label=" | Hub")
-            self.labels[f"{unit.name}_hub"] = unit_hub
-            box.pack_start(unit_hub, False, False, 0)
-
-            # Get the initial state of the hub
-            hub_state = self.afc_system.hubs.get(unit.name).state if self.afc_system and unit.name in self.afc_system.hubs else False
-            logging.info(f"Hub state for {unit.name}: {hub_state}")
-
-            # Create the status dot with the initial state
-            status_dot = Gtk.EventBox()
-            dot = Gtk.Label(label=" ")
-            dot.set_size_request(20, 20)
-            dot.set_valign(Gtk.Align.CENTER)
-            dot.set_halign(Gtk.Align.START)
-            dot.get_style_context().add_class("status-active" if hub_state else "status-empty")
-            status_dot.add(dot)
-
-            # Store the status dot reference for updates
-            self.labels[f"{unit.name}_status_dot"] = dot
-
-            box.pack_start(status_dot, False, False, 0)
-
-            unit_expander = Gtk.Expander()
-            unit_expander.set_label_widget(box)
-            unit_expander.set_halign(False)
-
-            unit_expander.set_expanded(True)  # Open the first expander by default
-            lane_grid = AutoGrid()
-            lane_grid.set_vexpand(False)  # Ensure lane_grid does not expand vertically
-
-            # Dynamically calculate the number of lanes per row based on screen width
-            logging.info(f"Screen width: {self._screen.width}")
-            lane_box_width = 150 + 10  # Lane frame width + margins (adjust as needed)
-            lanes_per_row = min(4, max(1, (self._screen.width - 150) // lane_box_width)) # At least one lane per row
-            logging.info(f"screen width {self._screen.width}")
-
-            for j, lane in enumerate(unit.lanes):
-                # Calculate row and column positions dynamically
-                row = j // lanes_per_row  # Each row contains up to 'lanes_per_row' lanes
-                col = j % lanes_per_row   # Column index within the row
-
-                lane_frame = Gtk.Frame()
-                lane_frame.set_size_request(150, 245)  # Set a fixed width for lane frames
-                lane_frame.set_vexpand(False)  # Ensure lane_frame does not expand vertically
-                lane_frame.set_hexpand(False)
-                lane_frame.set_valign(Gtk.Align.START)
-
-                lane_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=0)
-                lane_box.set_hexpand(False)
-                lane_box.get_style_context().add_class("button_active")
-
-                lane_info_box = self.create_lane_info_box(lane)
-                lane_info_box.set_margin_end(5)
-                lane_info_box.set_margin_start(5)
-                lane_info_box.set_margin_top(5)
-                lane_info_box.set_margin_bottom(5)
-                lane_info_box.set_valign(Gtk.Align.START)
-                lane_box.pack_start(lane_info_box, True, True, 0)
-
-                lane_frame.add(lane_box)
-                lane_frame.set_margin_start(5)
-                lane_frame.set_margin_end(5)
-                lane_frame.set_margin_top(2)
-                lane_frame.set_margin_bottom(2)
-
-                # Attach the lane frame to the grid at the calculated position
-                lane_grid.attach(lane_frame, col, row, 1, 1)
-
-                if lane.name == self.current_load:
-                    lane_frame.get_style_context().add_class("highlighted-lane")
-
-                # Store the lane_box for updating purposes
-                self.lane_widgets[f"{lane.name}_frame"] = lane_frame
-                self.lane_widgets[lane.name] = lane_box
-
-            unit_expander.add(lane_grid)
-            unit_box.pack_start(unit_expander, False, False, 0)
+                style.remove_class("button_active")
 
-        scroll = self._gtk.ScrolledWindow()
-        scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
-        scroll.add(unit_box)
+    def on_paged_units_toggled(self, button):
+        shared_state.paged_units = not self.paged_units
+        if self.select_mode:
+            self.exit_select_mode(None)
+        self.rebuild_lane_area()
+        button.set_label(_("All units") if self.paged_units else _("Unit pages"))
 
-        self.grid.attach(scroll, 0, 1, 4, 1)  # Attach unit box to grid
-        self.grid.show_all()
+    def rebuild_lane_area(self):
+        """
+        Replace the lane area with a fresh one, leaving the rest of the panel in place.
+        """
+        for name in ("lane_fill_id", "reflow_id", "prewarm_id"):
+            source = getattr(self, name)
+            if source is not None:
+                GLib.source_remove(source)
+                setattr(self, name, None)
+        for source in self._pending_lane_grid_updates.values():
+            GLib.source_remove(source)
+        self._pending_lane_grid_updates.clear()
+        self.prewarm_jobs.clear()
+        self.lanes_to_fill.clear()
+        self.unfilled_lanes.clear()
+        self.lazy_popovers.clear()
+
+        # Drop references to the old lane and unit widgets
+        prefixes = tuple(f"{name}_" for name in self.afc_lanes + self.afc_unit_names)
+        for registry in (self.labels, self.buttons, self.action_buttons):
+            for key in [key for key in registry if key.startswith(prefixes)]:
+                del registry[key]
+        self.lane_widgets = {}
+
+        self.grid.remove(self.lane_area)
+        self.create_unit_lane_layout()
+        self.enable_buttons(self.buttons_enabled)
+
+    def create_lane_skeleton(self, lane):
+        """
+        Create a placeholder lane card showing only the lane name in its status color.
+        """
+        skeleton = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+        skeleton.set_margin_top(5)
+        skeleton.set_margin_start(5)
+        skeleton.set_margin_end(5)
+        name = Gtk.Label(label=lane.name)
+        name.set_size_request(-1, 30)
+        for style in self.set_lane_status(lane, self.get_lane_status(lane)):
+            name.get_style_context().add_class(style)
+        skeleton.pack_start(name, False, False, 0)
+        return skeleton
+
+    def fill_lane_card(self, lane):
+        """
+        Replace a lane's skeleton with the full card.
+        """
+        self.unfilled_lanes.discard(lane.name)
+        lane_box = self.lane_widgets.get(lane.name)
+        if lane_box is None:
+            return
+        for child in lane_box.get_children():
+            lane_box.remove(child)
+
+        lane_info_box = self.create_lane_info_box(lane)
+        lane_info_box.set_margin_end(5)
+        lane_info_box.set_margin_start(5)
+        lane_info_box.set_margin_top(5)
+        lane_info_box.set_margin_bottom(5)
+        lane_info_box.set_valign(Gtk.Align.START)
+        lane_box.pack_start(lane_info_box, True, True, 0)
+        lane_box.show_all()
+
+        controls = self.action_buttons.get(f"{lane.name}_controls")
+        if controls:
+            controls.set_sensitive(self.buttons_enabled)
+        if self.select_mode:
+            self.buttons[f"{lane.name}_select"].show()
+
+    def fill_lane_cards(self):
+        """
+        Idle callback filling skeleton lane cards until LANE_FILL_BUDGET_MS is used.
+        """
+        deadline = time.monotonic() + LANE_FILL_BUDGET_MS / 1000
+        while self.lanes_to_fill:
+            self.fill_lane_card(self.lanes_to_fill.popleft())
+            if time.monotonic() >= deadline:
+                return True
+        self.lane_fill_id = None
         GLib.idle_add(self.log_lane_widget_sizes)
+        self.start_prewarm()
+        return False
+
+    ##################
+    #    Prewarm     #
+    ##################
 
-        self.set_uniform_frame_height()
+    def note_activity(self, *args):
+        self.last_activity = time.monotonic()
+
+    def start_prewarm(self):
+        """
+        Queue icon and menu prewarm jobs and run them at low priority.
+        """
+        self.prewarm_jobs.clear()
+        for unit in self.afc_units:
+            for lane in unit.lanes:
+                if lane.weight == 0:
+                    continue
+                color = lane.color or "#000000B3"
+                fill_px = SpoolIconCache.key(color, spool_fill_ratio(lane.weight or 1000), 40, 70)[1]
+                # Spools only get lighter while printing, and a reload brings back a full one
+                for fill in [fill_px - step for step in range(1, PREWARM_FILL_STEPS + 1)] + [70]:
+                    if fill > 0 and (color, fill, 40, 70) not in spool_icon_cache:
+                        self.prewarm_jobs.append(functools.partial(spool_icon_cache.get, color, fill / 70, 40, 70))
+        for key in list(self.lazy_popovers):
+            self.prewarm_jobs.append(functools.partial(self.build_lazy_popover, key))
+        self.schedule_prewarm()
+
+    def schedule_prewarm(self, delay=None):
+        if self.prewarm_id is not None or not self.prewarm_jobs:
+            return
+        if delay is None:
+            self.prewarm_id = GLib.idle_add(self.prewarm_slice, priority=GLib.PRIORITY_LOW)
+        else:
+            self.prewarm_id = GLib.timeout_add(int(delay * 1000), self.prewarm_slice, priority=GLib.PRIORITY_LOW)
+
+    @stall_tracked("prewarm_slice")
+    def prewarm_slice(self):
+        """
+        Run prewarm jobs for up to PREWARM_SLICE_MS, yielding to pending events.
+        """
+        self.prewarm_id = None
+        quiet_for = time.monotonic() - self.last_activity
+        if quiet_for < PREWARM_BACKOFF:
+            self.schedule_prewarm(PREWARM_BACKOFF - quiet_for)
+            return False
+        deadline = time.monotonic() + PREWARM_SLICE_MS / 1000
+        with trace_recorder.span("prewarm slice", "idle"):
+            while self.prewarm_jobs and time.monotonic() < deadline and not Gtk.events_pending():
+                self.prewarm_jobs.popleft()()
+        if self.prewarm_jobs:
+            self.schedule_prewarm()
+        else:
+            panel_log.debug("ui", "Prewarm done, icon cache %d entries (%d hits, %d misses)",
+                            len(spool_icon_cache.icons), spool_icon_cache.hits, spool_icon_cache.misses)
+        return False
 
     def create_lane_info_box(self, lane):
         lane_info_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
@@ -660,8 +2816,23 @@ class Panel(ScreenPanel):
         for style in status_color:
             lane_name.get_style_context().add_class(style)
 
+        # Selection checkbox, only shown in multi-select mode
+        select_check = Gtk.CheckButton()
+        select_check.set_no_show_all(True)
+        select_check.connect("toggled", self.on_lane_select_toggled, lane)
+        self.buttons[f"{lane.name}_select"] = select_check
+        lane_button_box.pack_start(select_check, False, False, 0)
+
         lane_button_box.pack_start(lane_name, True, True, 0)
 
+        # Badge for load/unload times drifting above the lane's baseline
+        drift_badge = Gtk.Label(label="⚠")
+        drift_badge.set_no_show_all(True)
+        drift_badge.get_style_context().add_class("lane-drift")
+        self.labels[f"{lane.name}_drift"] = drift_badge
+        lane_button_box.pack_start(drift_badge, False, False, 0)
+        self.update_lane_drift_badge(lane)
+
         # Replace dropdown with MenuButton for lane mapping
         lane_map_menu_button = self.create_lane_map_menu_button(lane)
         lane_map_menu_button.set_halign(Gtk.Align.FILL)
@@ -673,9 +2844,11 @@ class Panel(ScreenPanel):
 
         lane_info_grid = self.create_lane_info_grid(lane, lane_name, status)
         lane_info_box.pack_start(lane_info_grid, False, False, 0)
-        
+        self.labels[f"{lane.name}_lane_info_box"] = lane_info_box
+
         return lane_info_box
 
+    @traced("rebuild")
     def create_lane_info_grid(self, lane, lane_name, status):
         lane_info_grid = AutoGrid()
         lane_info_grid.set_row_homogeneous(False)
@@ -743,6 +2916,16 @@ class Panel(ScreenPanel):
             lane_action_box = self.create_lane_action_box(lane, status)
             lane_info_grid.attach(lane_action_box, 0, 2, 2, 2)
 
+            # Weight trend, tap for the full telemetry view
+            sparkline = Gtk.DrawingArea()
+            sparkline.set_size_request(-1, 14)
+            sparkline.connect("draw", self.on_lane_sparkline_draw, lane)
+            sparkline_box = Gtk.EventBox()
+            sparkline_box.add(sparkline)
+            sparkline_box.connect("button-release-event", self.show_telemetry_grid, lane)
+            lane_info_grid.attach(sparkline_box, 0, 4, 2, 1)
+            self.labels[f"{lane.name}_sparkline"] = sparkline
+
             self.buttons[f"{lane.name}_icon_button"] = icon_button
             self.buttons[f"{lane.name}_runout_button"] = runout_menu_button
             self.labels[f"{lane.name}_material_label"] = material_button
@@ -770,6 +2953,17 @@ class Panel(ScreenPanel):
         exit_button.connect("clicked", self.show_control_grid)
         hbox.pack_start(exit_button, False, False, 5)
 
+        test_all_button = Gtk.Button(label=_("Test\nAll"))
+        test_all_button.get_style_context().add_class("color3")
+        test_all_button.connect("clicked", self.start_lane_tests)
+        self.action_buttons['test_all'] = test_all_button
+        hbox.pack_start(test_all_button, False, False, 5)
+
+        results_button = Gtk.Button(label=_("Test\nResults"))
+        results_button.get_style_context().add_class("color4")
+        results_button.connect("clicked", self.show_test_results_grid)
+        hbox.pack_start(results_button, False, False, 5)
+
         for unit in self.afc_units:
             for lane in unit.lanes:
                 lane_button = Gtk.Button(label=f"Test\n{lane.name}")
@@ -793,7 +2987,7 @@ class Panel(ScreenPanel):
             logging.error("No lane selected for testing.")
             return
         logging.info(f"Testing lane: {lane.name}")
-        self._screen._send_action(widget, "printer.gcode.script", {"script": f"TEST LANE={lane.name}"})
+        self.send_gcode(widget, f"TEST LANE={lane.name}")
 
     def lane_controls(self, widget, lane, status):
         self.selected_lane = lane
@@ -829,15 +3023,15 @@ class Panel(ScreenPanel):
         self._gtk.remove_dialog(dialog)
         lane = self.selected_lane
         if response_id == RESPONSE_LOAD:
-            self._screen._send_action(dialog, "printer.gcode.script", {"script": f"CHANGE_TOOL LANE={lane.name}"})
+            self.send_gcode(dialog, f"CHANGE_TOOL LANE={lane.name}")
         elif response_id == RESPONSE_UNLOAD:
-            self._screen._send_action(dialog, "printer.gcode.script", {"script": "TOOL_UNLOAD"})
+            self.send_gcode(dialog, "TOOL_UNLOAD")
         elif response_id == RESPONSE_EJECT:
-            self._screen._send_action(dialog, "printer.gcode.script", {"script": f"LANE_UNLOAD LANE={lane.name}"})
+            self.send_gcode(dialog, f"LANE_UNLOAD LANE={lane.name}")
         elif response_id == RESPONSE_SET:
-            self._screen._send_action(dialog, "printer.gcode.script", {"script": f"SET_LANE_LOADED LANE={lane.name}"})
+            self.send_gcode(dialog, f"SET_LANE_LOADED LANE={lane.name}")
         elif response_id == RESPONSE_UNSET:
-            self._screen._send_action(dialog, "printer.gcode.script", {"script": "UNSET_LANE_LOADED"})
+            self.send_gcode(dialog, "UNSET_LANE_LOADED")
         elif response_id == Gtk.ResponseType.CANCEL:
             dialog.destroy()
 
@@ -860,33 +3054,37 @@ class Panel(ScreenPanel):
 
         return action_box
 
-    def calculate_max_frame_height(self):
-        max_height = 250
-        for lane_name, lane_box in self.lane_widgets.items():
-            # Skip any keys ending with "_frame"
-            if lane_name.endswith("_frame"):
-                continue
-
-            # Get the parent frame of the lane_box
-            lane_frame = lane_box.get_parent()
-            if lane_frame:
-                _, natural_height = lane_frame.get_preferred_height()
-                max_height = max(max_height, natural_height)
-                logging.info(f"Lane {lane_name} natural height: {natural_height}, max height so far: {max_height}")
-
-        logging.info(f"Calculated maximum frame height: {max_height}")
-        return max_height
-
-    def set_uniform_frame_height(self):
-        max_height = self.calculate_max_frame_height()
-        for lane_name, lane_box in self.lane_widgets.items():
-            if lane_name.endswith("_frame"):
-                continue
-
-            lane_frame = lane_box.get_parent()
-            if lane_frame:
-                lane_frame.set_size_request(-1, max_height)
-                lane_frame.queue_resize()
+    def on_lane_area_allocated(self, scroll, allocation):
+        """
+        Schedule a reflow when the lane area's width calls for a different column count.
+        """
+        card_width = LANE_CARD_WIDTH
+        for lane_grid, lane_frames in self.lane_grids:
+            if lane_frames:
+                # Fonts or themes can raise a card's minimum width. The allocated
+                # width is not used since cards stretch to fill their grid cells.
+                card_width = max(card_width, lane_frames[0].get_preferred_width()[0] + 10)
+                break
+        # The scrolled window's width comes from its parent, not the lane grid
+        columns = lane_grid_columns(allocation.width, card_width)
+        shared_state.lane_columns[(self._screen.width, self._screen.height)] = columns
+        if columns != self.lane_columns and self.reflow_id is None:
+            # Regridding inside size-allocate would re-enter layout
+            self.reflow_id = GLib.idle_add(self.reflow_lane_grids, columns)
+
+    @traced("rebuild")
+    def reflow_lane_grids(self, columns):
+        """
+        Move the lane frames to a new column count without rebuilding them.
+        """
+        self.reflow_id = None
+        panel_log.info("layout", "Reflowing lane grid: %d -> %d columns", self.lane_columns, columns)
+        self.lane_columns = columns
+        for lane_grid, lane_frames in self.lane_grids:
+            for j, lane_frame in enumerate(lane_frames):
+                lane_grid.child_set_property(lane_frame, "left-attach", j % columns)
+                lane_grid.child_set_property(lane_frame, "top-attach", j // columns)
+        return False
 
     ################
     # Controls     #
@@ -901,6 +3099,11 @@ class Panel(ScreenPanel):
         button_grid.set_column_homogeneous(False)
         button_grid.set_halign(Gtk.Align.START)
 
+        select_button = self._gtk.Button("complete", _("Select"), "color2")
+        select_button.connect("clicked", self.enter_select_mode)
+        self.action_buttons['select'] = select_button
+        button_grid.attach(select_button, 1, 0, 1, 1)
+
         move_button = self._gtk.Button("filament", _("Lane Move"), "color1")
         move_button.connect("clicked", self.show_lane_move_grid)
         self.action_buttons['lane_move'] = move_button
@@ -940,6 +3143,15 @@ class Panel(ScreenPanel):
         self.labels["toolchange_combined_label"] = toolchange_combined_label  # Store reference for updates
         controls_box.pack_start(toolchange_combined_label, False, False, 10)
 
+        toolchange_stats_label = Gtk.Label(label="")
+        self.labels["toolchange_stats_label"] = toolchange_stats_label
+        controls_box.pack_start(toolchange_stats_label, False, False, 0)
+
+        command_queue_label = Gtk.Label(label="Queue: 0")
+        command_queue_label.set_halign(Gtk.Align.END)
+        self.labels["command_queue_label"] = command_queue_label
+        controls_box.pack_start(command_queue_label, False, False, 0)
+
         alignment = Gtk.Alignment.new(0.5, 1.0, 1.0, 0.0)
         alignment.add(controls_box)
 
@@ -993,24 +3205,16 @@ class Panel(ScreenPanel):
         """
         Handle the toggle of the AFC virtual bypass button.
         """
-        # Toggle the state
         new_state = not self.virtual_bypass
-        self.virtual_bypass = new_state
-
-        # Update the button style
-        style = button.get_style_context()
-        style.remove_class("vb_active")
-        style.remove_class("vb_inactive")
         if new_state:
-            style.add_class("vb_active")
             logging.info("AFC Virtual Bypass enabled")
             self._screen.show_popup_message(_("Virtual Bypass enabled"), 1)
-            self._screen._ws.klippy.gcode_script("SET_FILAMENT_SENSOR SENSOR=virtual_bypass ENABLE=1")
         else:
-            style.add_class("vb_inactive")
             logging.info("AFC Virtual Bypass disabled")
             self._screen.show_popup_message(_("Virtual Bypass Disabled"), 1)
-            self._screen._ws.klippy.gcode_script("SET_FILAMENT_SENSOR SENSOR=virtual_bypass ENABLE=0")
+        self.propose_change(
+            ("virtual_bypass",), new_state, self.virtual_bypass, self.update_virtual_bypass_toggle, button,
+            f"SET_FILAMENT_SENSOR SENSOR=virtual_bypass ENABLE={1 if new_state else 0}")
 
     def update_virtual_bypass_toggle(self, new_status):
         """
@@ -1066,6 +3270,7 @@ class Panel(ScreenPanel):
 
         logging.info(f"Switching to selector grid for lane: {lane.name}")
         self.selected_lane = lane  # Store the selected lane
+        self.bulk_spool_lanes = []
 
         self.labels["title_label"].set_label(f"Change Spool {lane.name}")
 
@@ -1124,7 +3329,8 @@ class Panel(ScreenPanel):
         vbox.pack_start(lane_dropdown, False, False, 0)
 
         neg_move_button = self._gtk.Button("decrease", _("Move"), "color1")
-        neg_move_button.connect("clicked", self.on_neg_move_button_clicked)
+        neg_move_button.connect("pressed", self.on_jog_button_pressed, -1)
+        neg_move_button.connect("released", self.on_jog_button_released, -1)
         vbox.pack_start(neg_move_button, False, False, 5)
 
         # Create the distance grid
@@ -1133,9 +3339,21 @@ class Panel(ScreenPanel):
 
         # Add the move button
         move_button = self._gtk.Button("increase", _("Move"), "color3")
-        move_button.connect("clicked", self.on_move_button_clicked)
+        move_button.connect("pressed", self.on_jog_button_pressed, 1)
+        move_button.connect("released", self.on_jog_button_released, 1)
         vbox.pack_start(move_button, False, False, 5)
 
+        # Pending distance readout and cancel
+        jog_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+        jog_box.set_valign(Gtk.Align.CENTER)
+        self.labels["jog_pending_label"] = Gtk.Label(label="")
+        self.labels["jog_pending_label"].set_width_chars(10)
+        jog_box.pack_start(self.labels["jog_pending_label"], False, False, 0)
+        cancel_button = self._gtk.Button("cancel", _("Cancel"), "color2")
+        cancel_button.connect("clicked", self.cancel_jog)
+        jog_box.pack_start(cancel_button, False, False, 0)
+        vbox.pack_start(jog_box, False, False, 5)
+
         return vbox
 
     def update_toolchange_combined_label(self):
@@ -1147,6 +3365,98 @@ class Panel(ScreenPanel):
             toolchange_combined_label.set_label(
                 f"{self.afc_system.current_toolchange}/{self.afc_system.number_of_toolchanges}")
 
+    def update_toolchange_stats_label(self):
+        """
+        Show average and p95 toolchange time, with per extruder and lane detail in the tooltip.
+        """
+        label = self.labels.get("toolchange_stats_label")
+        if not label:
+            return
+        overall = self.toolchange_tracker.histograms.get(("all", "all", "toolchange"))
+        if not overall:
+            return
+        label.set_label(f"avg {overall.mean():.1f}s p95 {overall.percentile(95):.0f}s")
+
+        lines = []
+        for (scope, name, kind), histogram in sorted(self.toolchange_tracker.histograms.items()):
+            if scope == "all" or not histogram:
+                continue
+            lines.append(f"{scope} {name} {kind}: avg {histogram.mean():.1f}s "
+                         f"p95 {histogram.percentile(95):.0f}s (n={len(histogram)})")
+        label.set_tooltip_text("\n".join(lines))
+
+    def start_watchdog(self):
+        """
+        Start the shared watchdog timer if it is not already running.
+        """
+        if self.watchdog_timer is None:
+            self.watchdog_timer = GLib.timeout_add_seconds(WATCHDOG_INTERVAL, self.check_watchdog)
+
+    def check_watchdog(self):
+        """
+        Alert on loads/unloads running past their expected time. Stops itself
+        once no lane is loading or unloading.
+        """
+        active = list(self.toolchange_tracker.active())
+        self.watchdog_alerted &= {(lane, kind) for lane, kind, _ in active}
+        if not active:
+            self.watchdog_timer = None
+            return False
+
+        now = time.monotonic()
+        for lane_name, kind, started in active:
+            if (lane_name, kind) in self.watchdog_alerted:
+                continue
+            baseline = self.timing_log.baseline(lane_name, kind)
+            limit = baseline * WATCHDOG_FACTOR if baseline else WATCHDOG_DEFAULT_TIMEOUT
+            elapsed = now - started
+            if elapsed > limit:
+                self.watchdog_alerted.add((lane_name, kind))
+                self.show_watchdog_alert(lane_name, kind, elapsed, baseline)
+        return True
+
+    def show_watchdog_alert(self, lane_name, kind, elapsed, baseline):
+        lane = self.lane_by_name.get(lane_name)
+        if lane is None:
+            return
+        logging.warning(f"Watchdog: {kind} of {lane_name} running for {elapsed:.0f}s (baseline {baseline})")
+        expected = _("usually {:.0f}s").format(baseline) if baseline else _("no baseline yet")
+        label = Gtk.Label(hexpand=True, vexpand=True, wrap=True)
+        label.set_markup(_("<b>{}</b> has been {} for {:.0f}s ({}).\nSelect a recovery action:").format(
+            lane_name, _("loading") if kind == "load" else _("unloading"), elapsed, expected))
+        buttons = [
+            {"name": _("Eject"), "response": RESPONSE_EJECT, "style": 'dialog-secondary'},
+            {"name": _("Unload"), "response": RESPONSE_UNLOAD, "style": 'dialog-primary'},
+            {"name": _("Dismiss"), "response": Gtk.ResponseType.CANCEL, "style": 'dialog-error'},
+        ]
+        # Each dialog carries its own lane, so a second alert can't redirect the first
+        self._gtk.Dialog(_("Lane\nWatchdog"), buttons, label, functools.partial(self.watchdog_confirm, lane))
+
+    def watchdog_confirm(self, lane, dialog, response_id):
+        self._gtk.remove_dialog(dialog)
+        if response_id == RESPONSE_EJECT:
+            self.send_gcode(None, f"LANE_UNLOAD LANE={lane.name}")
+        elif response_id == RESPONSE_UNLOAD:
+            self.send_gcode(None, "TOOL_UNLOAD")
+
+    def update_lane_drift_badge(self, lane):
+        """
+        Show the drift badge when the lane's recent load or unload times exceed its baseline.
+        """
+        badge = self.labels.get(f"{lane.name}_drift")
+        if not badge:
+            return
+        drifting = self.timing_log.drifting(lane.name)
+        if not drifting:
+            badge.hide()
+            return
+        badge.set_tooltip_text("\n".join(
+            f"{kind} {ratio:.1f}x baseline "
+            f"({self.timing_log.baseline(lane.name, kind):.1f}s)"
+            for kind, ratio in drifting.items()
+        ))
+        badge.show()
+
     #################
     # More Controls #
     #################
@@ -1177,10 +3487,30 @@ class Panel(ScreenPanel):
         self.action_buttons['test'] = test_button
         more_controls_box.pack_start(test_button, False, False, 5)
 
+        history_button = self._gtk.Button("clock", _("History"), "color3")
+        history_button.set_halign(Gtk.Align.START)
+        history_button.connect("clicked", self.show_history_grid)
+        more_controls_box.pack_start(history_button, False, False, 5)
+
+        paged_button = self._gtk.Button("increase", _("All units") if self.paged_units else _("Unit pages"), "color2")
+        paged_button.set_halign(Gtk.Align.START)
+        paged_button.connect("clicked", self.on_paged_units_toggled)
+        more_controls_box.pack_start(paged_button, False, False, 5)
+
+        extruders_button = self._gtk.Button("extruder", _("Extruders"), "color2")
+        extruders_button.set_halign(Gtk.Align.START)
+        extruders_button.connect("clicked", self.show_extruders_grid)
+        more_controls_box.pack_start(extruders_button, False, False, 5)
+
+        diagnostics_button = self._gtk.Button("info", _("Diagnostics"), "color4")
+        diagnostics_button.set_halign(Gtk.Align.START)
+        diagnostics_button.connect("clicked", self.show_diagnostics_grid)
+        more_controls_box.pack_start(diagnostics_button, False, False, 5)
+
         return more_controls_box
 
     def on_calibration_clicked(self, switch):
-        self._screen._send_action(switch, "printer.gcode.script", {"script": "AFC_CALIBRATION"})
+        self.send_gcode(switch, "AFC_CALIBRATION")
         logging.info("AFC Calibration button clicked")
 
     def on_test_clicked(self, switch):
@@ -1197,13 +3527,13 @@ class Panel(ScreenPanel):
         """
         Handle the AFC LED switch state and update its style.
         """
-        self._screen._send_action(button, "printer.gcode.script", {"script": "TURN_ON_AFC_LED"})
+        self.send_gcode(button, "TURN_ON_AFC_LED")
 
     def on_afc_led_off(self, button):
         """
         Handle the AFC LED switch state and update its style.
         """
-        self._screen._send_action(button, "printer.gcode.script", {"script": "TURN_OFF_AFC_LED"})
+        self.send_gcode(button, "TURN_OFF_AFC_LED")
 
     def create_afc_led_toggle(self):
         """
@@ -1248,24 +3578,16 @@ class Panel(ScreenPanel):
         """
         Handle the toggle of the AFC LED button.
         """
-        # Toggle the state
         new_state = not self.led_state
-        self.led_state = new_state
-
-        # Update the button style
-        style = button.get_style_context()
-        style.remove_class("vb_active")
-        style.remove_class("vb_inactive")
         if new_state:
-            style.add_class("vb_active")
             logging.info("AFC LED enabled")
             self._screen.show_popup_message(_("AFC LED enabled"), 1)
-            self._screen._send_action(button, "printer.gcode.script", {"script": "TURN_ON_AFC_LED"})
         else:
-            style.add_class("vb_inactive")
             logging.info("AFC LED disabled")
             self._screen.show_popup_message(_("AFC LED disabled"), 1)
-            self._screen._send_action(button, "printer.gcode.script", {"script": "TURN_OFF_AFC_LED"})
+        self.propose_change(
+            ("led_state",), new_state, self.led_state, self.update_afc_led_toggle, button,
+            "TURN_ON_AFC_LED" if new_state else "TURN_OFF_AFC_LED")
 
     def update_afc_led_toggle(self, new_status):
         """
@@ -1296,8 +3618,8 @@ class Panel(ScreenPanel):
         # "T11": "T11", "T21": "T21", "T31": "T31", "T41": "T41", "T51": "T51", "T61": "T61",
         # "T12": "T12", "T22": "T22", "T32": "T32", "T42": "T42", "T52": "T52", "T62": "T62"}
 
-        logging.info(f"Options passed to menu button: {options}")
-        logging.info(f"Initial selection (lane.map): {lane.map}")
+        panel_log.dump("menu", "Options passed to menu button: %s", options)
+        panel_log.debug("menu", "Initial selection (lane.map): %s", lane.map)
 
         initial_selection = None
         for t_value, lane_name in options.items():
@@ -1316,38 +3638,36 @@ class Panel(ScreenPanel):
         menu_button.set_halign(Gtk.Align.END)
         menu_button.set_vexpand(False)
 
-        # Create the popover
-        popover = Gtk.Popover()
+        def build_popover_content():
+            # Add a scrolled window to the popover
+            scrolled_window = self._gtk.ScrolledWindow()
+            scrolled_window.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+            scrolled_window.set_min_content_height(450)  # adjust to your needs
+            scrolled_window.set_max_content_height(600)  # limit how tall the popover grows
+            scrolled_window.set_min_content_width(600)  # adjust to your needs
 
-        # Add a scrolled window to the popover
-        scrolled_window = self._gtk.ScrolledWindow()
-        scrolled_window.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
-        scrolled_window.set_min_content_height(450)  # adjust to your needs
-        scrolled_window.set_max_content_height(600)  # limit how tall the popover grows
-        scrolled_window.set_min_content_width(600)  # adjust to your needs
-
-        # Container for the scrollable content
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2, margin=5)
-        scrolled_window.add(box)
-
-        # Add buttons to the box
-        for t_value in options:
-            item = Gtk.ModelButton(label=t_value)
-            item.get_style_context().add_class("scroll_button")
-            item.set_halign(Gtk.Align.START)
-            item.get_style_context().add_class("large-button")
-
-            def on_select(_, value=t_value):
-                logging.info(f"MenuButton selection changed: {value}")
-                self.on_lane_map_changed(menu_button, value, lane, label)
-
-            item.connect("clicked", on_select)
-            box.pack_start(item, True, True, 2)
-
-        box.show_all()
-        scrolled_window.show_all()
-        popover.add(scrolled_window)
-        menu_button.set_popover(popover)
+            # Container for the scrollable content
+            box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2, margin=5)
+            scrolled_window.add(box)
+
+            # Add buttons to the box
+            for t_value in options:
+                item = Gtk.ModelButton(label=t_value)
+                item.get_style_context().add_class("scroll_button")
+                item.set_halign(Gtk.Align.START)
+                item.get_style_context().add_class("large-button")
+
+                def on_select(_, value=t_value):
+                    logging.info(f"MenuButton selection changed: {value}")
+                    self.on_lane_map_changed(menu_button, value, lane, label)
+
+                item.connect("clicked", on_select)
+                box.pack_start(item, True, True, 2)
+
+            scrolled_window.show_all()
+            return scrolled_window
+
+        self.attach_lazy_popover(f"{lane.name}_map", menu_button, build_popover_content)
 
         self.labels[f"{lane.name}_map_menu_button"] = menu_button
         return menu_button
@@ -1363,8 +3683,8 @@ class Panel(ScreenPanel):
         # Use lane names as options, excluding the current lane's name and adding "None"
         options = ["NONE"] + [lane_name for lane_name in self.afc_lanes if lane_name != lane.name]
 
-        logging.info(f"Options passed to menu button: {options}")
-        logging.info(f"Initial selection (lane.inf): {lane.runout_lane}")
+        panel_log.dump("menu", "Options passed to menu button: %s", options)
+        panel_log.debug("menu", "Initial selection (lane.inf): %s", lane.runout_lane)
 
         # Validate current lane.inf
         initial_selection = lane.runout_lane if lane.runout_lane in options else "NONE"
@@ -1378,47 +3698,73 @@ class Panel(ScreenPanel):
         menu_button.set_halign(Gtk.Align.END)
         menu_button.set_vexpand(False)
 
-        # Create the popover menu
-        popover = Gtk.Popover()
+        def build_popover_content():
+            # Add a scrolled window to the popover
+            scrolled_window = self._gtk.ScrolledWindow()
+            scrolled_window.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+            scrolled_window.set_min_content_height(450)  # adjust to your needs
+            scrolled_window.set_max_content_height(600)  # limit how tall the popover grows
+            scrolled_window.set_min_content_width(600)  # adjust to your needs
 
-        # Add a scrolled window to the popover
-        scrolled_window = self._gtk.ScrolledWindow()
-        scrolled_window.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
-        scrolled_window.set_min_content_height(450)  # adjust to your needs
-        scrolled_window.set_max_content_height(600)  # limit how tall the popover grows
-        scrolled_window.set_min_content_width(600)  # adjust to your needs
-
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8, margin=10)
-        scrolled_window.add(box)
-
-        # Create buttons for each option
-        for lane_name in options:
-            item = Gtk.ModelButton(label=lane_name)
-            item.get_style_context().add_class("scroll_button")
-            item.set_name("lane-inf-item")
-            item.set_halign(Gtk.Align.FILL)
-            item.get_style_context().add_class("large-button")
-
-            def on_select(_, value=lane_name):
-                logging.info(f"MenuButton selection changed: {value} ∞")
-                self.on_lane_inf_changed(menu_button, value, lane, label)
-
-            item.connect("clicked", on_select)
-            box.pack_start(item, True, True, 0)
-
-        box.show_all()
-        scrolled_window.show_all()
-        popover.add(scrolled_window)
-        menu_button.set_popover(popover)
+            box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8, margin=10)
+            scrolled_window.add(box)
+
+            # Create buttons for each option
+            for lane_name in options:
+                item = Gtk.ModelButton(label=lane_name)
+                item.get_style_context().add_class("scroll_button")
+                item.set_name("lane-inf-item")
+                item.set_halign(Gtk.Align.FILL)
+                item.get_style_context().add_class("large-button")
+
+                def on_select(_, value=lane_name):
+                    logging.info(f"MenuButton selection changed: {value} ∞")
+                    self.on_lane_inf_changed(menu_button, value, lane, label)
+
+                item.connect("clicked", on_select)
+                box.pack_start(item, True, True, 0)
+
+            scrolled_window.show_all()
+            return scrolled_window
+
+        self.attach_lazy_popover(f"{lane.name}_inf", menu_button, build_popover_content)
 
         # Store reference
         self.labels[f"{lane.name}_inf_menu_button"] = menu_button
         return menu_button
 
+    def attach_lazy_popover(self, key, menu_button, build_content):
+        """
+        Give ``menu_button`` an empty popover whose content is built on first open.
+
+        :param build_content: Returns the popover's child widget.
+        """
+        popover = Gtk.Popover()
+        menu_button.set_popover(popover)
+        self.lazy_popovers[key] = (popover, build_content)
+        menu_button.connect("toggled", self.on_lazy_popover_toggled, key)
+
+    def on_lazy_popover_toggled(self, menu_button, key):
+        if menu_button.get_active():
+            self.build_lazy_popover(key)
+
+    def build_lazy_popover(self, key):
+        """
+        Build a lazy popover's content if it has not been built yet.
+        """
+        entry = self.lazy_popovers.pop(key, None)
+        if entry is None:
+            return False
+        popover, build_content = entry
+        with trace_recorder.span("popover", "rebuild", key=key):
+            popover.add(build_content())
+        return True
+
     ##################
     #    Updating    #
     ##################
 
+    @traced("update")
     def update_ui(self, afc_data):
         try:
             if not afc_data or not isinstance(afc_data, dict):
@@ -1430,7 +3776,7 @@ class Panel(ScreenPanel):
             if system_data:
                 self.update_afc_system(system_data)
                 # Update LED state if it has changed
-                new_led_state = system_data.get("led_state", self.led_state)
+                new_led_state = self.reconcile_change(("led_state",), system_data.get("led_state", self.led_state))
                 if self.led_state != new_led_state:
                     logging.info(f"LED state changed: {self.led_state} → {new_led_state}")
                     self.update_afc_led_toggle(new_led_state)
@@ -1444,6 +3790,11 @@ class Panel(ScreenPanel):
                     hub_state = hub_data.get("state", False)  # Default to False if state is not provided
                     self.update_hub_status(hub_name, hub_state)
 
+            for buffer_name, buffer_data in system_data.get("buffers", {}).items():
+                self.history.record("buffer", buffer_name, "state", buffer_data.get("state"))
+
+            classified = self.classify_lanes(afc_data)
+
             for unit in self.afc_units:
                 for lane in unit.lanes:
                     lane_data = afc_data.get(unit.name, {}).get(lane.name)
@@ -1451,8 +3802,8 @@ class Panel(ScreenPanel):
                         logging.warning(f"No data found for lane: {lane.name}")
                         continue
 
-                    lane_status = self.get_lane_status_from_data(lane_data)
-                    lane_name = self.labels.get(f"{lane.name}")
+                    lane_status, lane_styles = classified[lane.name]
+                    lane.afc_status = lane_data.get("status", lane.afc_status)
                     old_buffer = getattr(lane, "buffer", None)
                     old_buffer_status = getattr(lane, "buffer_status", None)
 
@@ -1460,16 +3811,18 @@ class Panel(ScreenPanel):
                     lane.buffer_status = lane_data.get("buffer_status", lane.buffer_status)
 
                     if lane.status != lane_status:
-                        self.handle_lane_status_update(lane, lane_status)
+                        self.handle_lane_status_update(lane, lane_status, lane_styles)
 
-                    new_map = lane_data.get("map", lane.map)
+                    new_map = self.reconcile_change(("map", lane.name), lane_data.get("map", lane.map))
                     if lane.map != new_map:
                         logging.info(f"Updating mapping for {lane.name}: {lane.map} → {new_map}")
                         lane.map = new_map
                         self.update_lane_map(lane)
 
-                    if lane.runout_lane != lane_data.get("runout_lane", lane.runout_lane):
-                        lane.runout_lane = lane_data.get("runout_lane", lane.runout_lane)
+                    new_runout = self.reconcile_change(
+                        ("runout_lane", lane.name), lane_data.get("runout_lane", lane.runout_lane))
+                    if lane.runout_lane != new_runout:
+                        lane.runout_lane = new_runout
                         self.update_lane_runout(lane)
 
                     if lane.material != lane_data.get("material", lane.material):
@@ -1489,10 +3842,20 @@ class Panel(ScreenPanel):
                         lane.load = bool(lane_data.get("load", lane.load))
                         self.update_lane_load(lane)
 
+                    lane.prep = bool(lane_data.get("prep", lane.prep))
+                    lane.tool_loaded = bool(lane_data.get("tool_loaded", lane.tool_loaded))
+                    self.record_lane_history(lane)
+                    if self.bulk_operation:
+                        self.update_bulk_progress(lane)
+                    if self.telemetry[lane.name].sample(lane):
+                        self.update_lane_telemetry(lane)
+
                     if lane.name == (self.afc_system.current_load if self.afc_system else None):
                         if lane.buffer != old_buffer or lane.buffer_status != old_buffer_status:
                             self.update_system_container()
 
+                self.update_unit_summary(unit)
+
         except Exception as e:
             logging.error(f"Failed to update UI: {e}")
 
@@ -1510,6 +3873,7 @@ class Panel(ScreenPanel):
 
         # Update the stored state
         self.hub_states[hub_name] = hub_state
+        self.history.record("hub", hub_name, "state", hub_state)
 
         # Get the status dot widget
         status_dot = self.labels.get(f"{hub_name}_status_dot")
@@ -1546,7 +3910,21 @@ class Panel(ScreenPanel):
         if self.afc_system.current_load != new_current_load:
             logging.info(f"Current load changed: {self.afc_system.current_load} → {new_current_load}")
             self.afc_system.current_load = new_current_load
+            self.history.record("system", "system", "current_load", new_current_load)
             self.update_system_container()
+            for name in self.extruder_rows:
+                self.update_extruder_row(name)
+
+        for name, extruder_data in system_data.get("extruders", {}).items():
+            self.update_extruder(name, extruder_data)
+
+        for name, buffer_data in system_data.get("buffers", {}).items():
+            buffer = self.afc_system.buffers.get(name)
+            if buffer and buffer.state != buffer_data.get("state", buffer.state):
+                buffer.state = buffer_data.get("state")
+                for extruder_name, extruder in self.afc_system.extruders.items():
+                    if extruder.buffer == name:
+                        self.update_extruder_row(extruder_name)
 
         # Check and update current_toolchange
         new_toolchange = system_data.get("current_toolchange", self.afc_system.current_toolchange)
@@ -1559,8 +3937,9 @@ class Panel(ScreenPanel):
             self.afc_system.number_of_toolchanges = new_toolchange_count
             self.update_toolchange_combined_label()
 
-    def handle_lane_status_update(self, lane, lane_status):
-        logging.info(f"Handling lane status update for {lane.name}: {lane.status} → {lane_status}")
+    def handle_lane_status_update(self, lane, lane_status, styles=None):
+        panel_log.aggregate("status", f"{lane.name} status", "%s status updated: %s → %s",
+                            lane.name, lane.status, lane_status)
 
         UNREADY_STATUSES = {UNLOADED, PREP_NOT_LOAD, LOAD_NOT_PREP}
         READY_STATUSES = {LOADED, TOOLED, LOADING, UNLOADING}
@@ -1573,13 +3952,23 @@ class Panel(ScreenPanel):
             return "other"
 
         old_status = lane.status  # Save the previous status
-        logging.info(f"Old status for {lane.name}: {old_status}, New status: {lane_status}")
 
-        frame_context = self.lane_widgets[f"{lane.name}_frame"].get_style_context()
-        if old_status in {UNLOADING, TOOLED} and lane_status in {LOADED, "null"}:
-            frame_context.remove_class("highlighted-lane")
-        elif lane_status in {LOADING, TOOLED, TOOL_LOADED}:
-            frame_context.add_class("highlighted-lane")
+        measurements = self.toolchange_tracker.transition(lane.name, lane.extruder, old_status, lane_status)
+        if measurements:
+            self.update_toolchange_stats_label()
+            for kind, lane_name, duration in measurements:
+                if kind in ("load", "unload"):
+                    self.timing_log.record(lane_name, kind, duration)
+            self.update_lane_drift_badge(lane)
+        if lane_status in (LOADING, UNLOADING):
+            self.start_watchdog()
+
+        lane_frame = self.lane_widgets.get(f"{lane.name}_frame")  # Missing until a paged unit is viewed
+        if lane_frame is not None:
+            if old_status in {UNLOADING, TOOLED} and lane_status in {LOADED, "null"}:
+                lane_frame.get_style_context().remove_class("highlighted-lane")
+            elif lane_status in {LOADING, TOOLED, TOOL_LOADED}:
+                lane_frame.get_style_context().add_class("highlighted-lane")
         
 
         old_category = status_category(old_status)
@@ -1595,39 +3984,41 @@ class Panel(ScreenPanel):
         )
 
         if old_status != lane_status:
-            logging.info(f"Updating UI grid for {lane.name} due to status change: {lane_status}")
+            panel_log.debug("ui", "Updating UI grid for %s due to status change: %s", lane.name, lane_status)
             self.replace_lane_info_grid(lane, self.labels.get(f"{lane.name}"), lane_status)
 
         # Update the lane's status in the UI
-        self.update_lane_status(lane, lane_status)
+        self.update_lane_status(lane, lane_status, styles)
 
-    def update_lane_status(self, lane, status):
+    def update_lane_status(self, lane, status, styles=None):
         """
         Update the status part of the UI, including the lane's color and status.
+
+        :param styles: Precomputed style classes for ``status``, looked up if omitted.
         """
         lane_box = self.lane_widgets.get(lane.name)
-        logging.info(f"Updating lane status for {lane.name}: {status}")
+        panel_log.debug("ui", "Updating lane status for %s: %s", lane.name, status)
+        if lane.name in self.unfilled_lanes:
+            return
         if not lane_box:
-            logging.info(f"Lane box not found for lane: {lane.name}")
+            panel_log.aggregate("ui", f"{lane.name} box", "Lane box not found for lane: %s", lane.name)
             return
 
         # Get the lane menu button widget
         lane_name = self.labels.get(f"{lane.name}")
         if not lane_name:
-            logging.info(f"Lane menu button not found for lane: {lane.name}")
+            panel_log.aggregate("ui", f"{lane.name} menu", "Lane menu button not found for lane: %s", lane.name)
             return
 
         # Determine the new status color class
-        status_color = self.set_lane_status(lane, status)
+        status_color = styles if styles is not None else self.set_lane_status(lane, status)
 
         # Update the style context of the lane menu button
         style_context = lane_name.get_style_context()
 
         # Remove all existing status-related classes
-        style_context.remove_class("status-tooled")
-        style_context.remove_class("status-loaded")
-        style_context.remove_class("status-warning")
-        style_context.remove_class("status-lane-empty")
+        for style in LANE_STATUS_CLASSES:
+            style_context.remove_class(style)
 
         # Add the new status class
         for style in status_color:
@@ -1672,7 +4063,7 @@ class Panel(ScreenPanel):
         if icon_button:
             icon = Gtk.Image.new_from_pixbuf(lane.icon(width=40,height=70))
             icon_button.set_image(icon)
-            logging.info(f"replacing icon {icon}")
+            panel_log.debug("ui", "Replaced icon for %s", lane.name)
             icon_button.show_all()
 
     def update_lane_load(self, lane):
@@ -1702,7 +4093,7 @@ class Panel(ScreenPanel):
             return
 
         # Get the current lane object
-        current_lane = next((lane for lane in self.afc_lane_data if lane.name == self.afc_system.current_load), None)
+        current_lane = self.lane_by_name.get(self.afc_system.current_load)
 
         # Update the loaded label
         if loaded_label:
@@ -1729,22 +4120,14 @@ class Panel(ScreenPanel):
         :param label: The label inside the MenuButton that displays the current value.
         """
         if selected_value and selected_value != lane.map:
-            old_mapping = lane.map
-            lane.map = selected_value  # Update lane map
-
-            logging.info(f"Updated default mapping for {lane.name}: {old_mapping} → {selected_value}")
-
-            # Update the label text in the MenuButton
-            label.set_text(selected_value)
-
-            # Send G-code to update the mapping
-            self._screen._send_action(menu_button, "printer.gcode.script", {
-                "script": f"SET_MAP LANE={lane.name} MAP={selected_value}"
-            })
+            logging.info(f"Updated default mapping for {lane.name}: {lane.map} → {selected_value}")
 
-            # Optionally refresh UI
-            self.refresh_lane_dropdowns()
+            def apply(value):
+                lane.map = value
+                self.refresh_lane_dropdowns()
 
+            self.propose_change(("map", lane.name), selected_value, lane.map, apply, menu_button,
+                                f"SET_MAP LANE={lane.name} MAP={selected_value}")
 
     def refresh_lane_dropdowns(self):
         """
@@ -1755,6 +4138,9 @@ class Panel(ScreenPanel):
                 self.update_lane_map(lane)
 
     def replace_lane_info_grid(self, lane, lane_name, status):
+        if lane.name in self.unfilled_lanes or lane.name not in self.lane_widgets:
+            return  # The card is a skeleton or not built yet, and will use the current status
+
         # Cancel any pending update for this lane
         if hasattr(self, '_pending_lane_grid_updates') and lane.name in self._pending_lane_grid_updates:
             GLib.source_remove(self._pending_lane_grid_updates[lane.name])
@@ -1764,18 +4150,9 @@ class Panel(ScreenPanel):
             parent = old_grid.get_parent() if old_grid else None
             if old_grid and parent:
                 parent.remove(old_grid)
-            # Rebuild parent if lost
+            # Fall back to the lane's info box if the grid lost its parent
             if not parent:
-                # Find the unit and re-add the lane frame/grid to the unit's lane_grid
-                for unit in self.afc_units:
-                    for l in unit.lanes:
-                        if l.name == lane.name:
-                            # Find the unit_expander and lane_grid
-                            # This is pseudo-code, you may need to adapt it:
-                            for child in unit_expander.get_children():
-                                if isinstance(child, AutoGrid):
-                                    parent = child
-                                    break
+                parent = self.labels.get(f"{lane.name}_lane_info_box")
             new_grid = self.create_lane_info_grid(lane, lane_name, status)
             if parent:
                 parent.add(new_grid)
@@ -1785,7 +4162,8 @@ class Panel(ScreenPanel):
             return False  # Only run once
 
         # Schedule the update after 50ms
-        self._pending_lane_grid_updates[lane.name] = GLib.timeout_add(50, do_update)
+        self._pending_lane_grid_updates[lane.name] = GLib.timeout_add(
+            50, self.stall_detector.wrap("replace_lane_info_grid", do_update))
 
     def update_lane_ui(self, lane):
         lane_box = self.lane_widgets.get(lane.name)
@@ -1809,85 +4187,66 @@ class Panel(ScreenPanel):
         print(f"Map button clicked: {lane.map}")
 
     def on_lane_inf_changed(self, menu_button, value, lane, label):
-        if value and value != lane.map:
-            old_runout = lane.runout_lane
-            lane.runout_lane = value  # Update lane map
-            logging.info(f"Updated default mapping for {lane.name}: {old_runout} → {value}")
-            label.set_text(f"{value} ∞")
-
+        if value and value != lane.runout_lane:
+            logging.info(f"Updated runout lane for {lane.name}: {lane.runout_lane} → {value}")
 
-            # Send G-code to update the mapping
-            self._screen._send_action(menu_button, "printer.gcode.script", {
-                "script": f"SET_RUNOUT LANE={lane.name} RUNOUT={value}"
-            })
+            def apply(runout_lane):
+                lane.runout_lane = runout_lane
+                self.update_lane_runout(lane)
 
+            self.propose_change(("runout_lane", lane.name), value, lane.runout_lane, apply, menu_button,
+                                f"SET_RUNOUT LANE={lane.name} RUNOUT={value}")
 
     def on_load_lane_clicked(self, button, lane):
         logging.info(f"Load Lane button clicked for {lane.name}")
-        self._screen._send_action(button, "printer.gcode.script", {"script": f"CHANGE_TOOL LANE={lane.name}"})
+        self.send_gcode(button, f"CHANGE_TOOL LANE={lane.name}")
 
     def on_eject_lane_clicked(self, button, lane):
         logging.info(f"Eject Lane button clicked for {lane.name}")
-        self._screen._send_action(button, "printer.gcode.script", {"script": f"LANE_UNLOAD LANE={lane.name}"})
+        self.send_gcode(button, f"LANE_UNLOAD LANE={lane.name}")
 
     def on_unload_lane_clicked(self, button, lane):
         logging.info(f"Unload Lane button clicked for {lane.name}")
-        self._screen._send_action(button, "printer.gcode.script", {"script": f"TOOL_UNLOAD"})
+        self.send_gcode(button, "TOOL_UNLOAD")
 
     #################
     #    Status     #
     #################
 
     def get_lane_status(self, lane):
-        if lane.tool_loaded:
-            status = TOOLED
-        elif lane.prep and lane.load and not lane.tool_loaded:
-            status = LOADED
-        elif lane.prep and not lane.load:
-            status = PREP_NOT_LOAD
-        elif lane.load and not lane.prep:
-            status = LOAD_NOT_PREP
-        else: 
-            status = UNLOADED
-
-        return status
+        return LANE_STATUS_TABLE[lane_status_code(lane.prep, lane.load, lane.tool_loaded, lane.afc_status)]
 
     def get_lane_status_from_data(self, lane_data):
-        status = lane_data.get("status", False)
-        # logging.info(f"get status: {status}")
-        if lane_data.get("prep") and lane_data.get("load"):
-            if status == "Tool Loading":
-                return LOADING
-            elif status == "Tool Unloading":
-                return UNLOADING
-            elif lane_data.get("tool_loaded"):
-                return TOOLED
-            elif not lane_data.get("tool_loaded"):
-                return LOADED
-
-        elif lane_data.get("prep") and not lane_data.get("load"):
-            return PREP_NOT_LOAD
-        elif lane_data.get("load") and not lane_data.get("prep"):
-            return LOAD_NOT_PREP
-        else:
-            return UNLOADED
+        return LANE_STATUS_TABLE[lane_status_code(
+            lane_data.get("prep"), lane_data.get("load"),
+            lane_data.get("tool_loaded"), lane_data.get("status"))]
 
-    def set_lane_status(self, lane, status):
-        logging.info(f"Lane {lane.name} status: {status}")
-        style = []
-        if status == TOOLED:
-            style.append("status-tooled")
-            style.append("bold-text")
-        elif status == LOADED:
-            style.append("status-loaded")
-        elif status == PREP_NOT_LOAD:
-            style.append("status-warning")
-        elif status == LOAD_NOT_PREP:
-            style.append("status-warning")
-        else:
-            style.append("status-lane-empty")
+    def classify_lanes(self, afc_data):
+        """
+        Classify every lane in one pass over the AFC status payload.
 
-        return style
+        :param afc_data: The AFC status payload keyed by unit name.
+        :return: Dict of lane name to (status, style classes). Lanes missing
+                 from the payload keep their current status.
+        """
+        classified = {}
+        for unit in self.afc_units:
+            unit_data = afc_data.get(unit.name) or {}
+            for lane in unit.lanes:
+                lane_data = unit_data.get(lane.name)
+                if lane_data:
+                    code = lane_status_code(
+                        lane_data.get("prep"), lane_data.get("load"),
+                        lane_data.get("tool_loaded"), lane_data.get("status"))
+                    classified[lane.name] = (LANE_STATUS_TABLE[code], LANE_STYLE_TABLE[code])
+                else:
+                    classified[lane.name] = (
+                        lane.status, LANE_STATUS_STYLES.get(lane.status, DEFAULT_LANE_STATUS_STYLE))
+        return classified
+
+    def set_lane_status(self, lane, status):
+        panel_log.debug("status", "Lane %s status: %s", lane.name, status)
+        return list(LANE_STATUS_STYLES.get(status, DEFAULT_LANE_STATUS_STYLE))
 
     ##################
     #    Dropdowns   #
@@ -2031,6 +4390,8 @@ class Panel(ScreenPanel):
         model = dropdown.get_model()
         active_iter = dropdown.get_active_iter()
         if active_iter is not None:
+            if self.jog_pending:
+                self.flush_jog()  # Pending taps belong to the previous lane
             self.move_lane = model[active_iter][0]  # Update the selected lane
             logging.info(f"Selected lane: {self.move_lane}")
         else:
@@ -2051,6 +4412,7 @@ class Panel(ScreenPanel):
                 return
             logging.debug("Dropdown popup close")
 
+    @stall_tracked("dropdown_keep_open")
     def dropdown_keep_open(self):
         """
         Reopen the dropdown if it closes too quickly.
@@ -2060,29 +4422,118 @@ class Panel(ScreenPanel):
 
     def on_move_button_clicked(self, button):
         """
-        Handle the move button click and send the move command.
+        Handle a tap on the move button, adding the distance to the pending jog.
         """
-        if not self.move_lane:
-            logging.warning("Move command failed: No lane selected.")
-            return
-
-        logging.info(f"Moving to lane: {self.move_lane} with distance: {self.distance}")
-        self._screen._send_action(button, "printer.gcode.script", {
-            "script": f"LANE_MOVE LANE={self.move_lane} DISTANCE={self.distance}"
-        })
+        self.accumulate_jog(self.distance)
 
     def on_neg_move_button_clicked(self, button):
         """
-        Handle the move button click and send the move command.
+        Handle a tap on the reverse move button, subtracting the distance from the pending jog.
+        """
+        self.accumulate_jog(-self.distance)
+
+    def on_jog_button_pressed(self, button, direction):
+        """
+        Start the hold timer; if the button is still down when it fires, jogging streams.
+        """
+        self.stop_jog_hold()
+        self.jog_hold_direction = direction
+        self.jog_hold_timer = GLib.timeout_add(JOG_HOLD_DELAY_MS, self.start_jog_hold)
+
+    def on_jog_button_released(self, button, direction):
+        hold_started, self.jog_hold_started = self.jog_hold_started, False
+        if not hold_started:
+            # Released before the hold delay: a tap
+            self.stop_jog_hold()
+            if direction > 0:
+                self.on_move_button_clicked(button)
+            else:
+                self.on_neg_move_button_clicked(button)
+            return
+        self.stop_jog_hold()
+
+    def accumulate_jog(self, distance):
+        """
+        Add a signed distance to the pending jog and restart the merge window.
         """
         if not self.move_lane:
             logging.warning("Move command failed: No lane selected.")
             return
+        self.jog_pending += distance
+        if self.jog_timer is not None:
+            GLib.source_remove(self.jog_timer)
+        self.jog_timer = GLib.timeout_add(JOG_MERGE_WINDOW_MS, self.flush_jog)
+        self.update_jog_label()
+
+    def flush_jog(self):
+        """
+        Send the accumulated distance as a single LANE_MOVE.
+        """
+        if self.jog_timer is not None:
+            GLib.source_remove(self.jog_timer)
+            self.jog_timer = None
+        distance, self.jog_pending = self.jog_pending, 0
+        if distance and self.move_lane:
+            logging.info(f"Moving lane: {self.move_lane} with distance: {distance}")
+            self.send_gcode(None, f"LANE_MOVE LANE={self.move_lane} DISTANCE={distance}")
+        self.update_jog_label()
+        return False
+
+    def cancel_jog(self, button):
+        """
+        Drop the pending distance and stop any hold-to-jog stream.
+        """
+        if self.jog_timer is not None:
+            GLib.source_remove(self.jog_timer)
+            self.jog_timer = None
+        self.jog_pending = 0
+        self.stop_jog_hold()
+
+    def start_jog_hold(self):
+        """
+        Begin streaming bounded chunks while the move button is held.
+        """
+        if self.jog_pending:
+            self.flush_jog()
+        # The stream can stop at JOG_HOLD_MAX_DISTANCE while the button is still down
+        self.jog_hold_started = True
+        self.jog_holding = True
+        self.jog_hold_total = 0
+        self.jog_hold_timer = GLib.timeout_add(JOG_HOLD_INTERVAL_MS, self.jog_hold_step)
+        self.jog_hold_step()
+        return False
 
-        logging.info(f"Moving to lane: {self.move_lane} with distance: {self.distance}")
-        self._screen._send_action(button, "printer.gcode.script", {
-            "script": f"LANE_MOVE LANE={self.move_lane} DISTANCE=-{self.distance}"
-        })
+    def jog_hold_step(self):
+        if not self.move_lane or self.jog_hold_total + self.distance > JOG_HOLD_MAX_DISTANCE:
+            self.stop_jog_hold()
+            return False
+        script = f"LANE_MOVE LANE={self.move_lane} DISTANCE={self.jog_hold_direction * self.distance}"
+        # Only one chunk in flight at a time so moves never pile up behind the button
+        self.command_queue.expire()
+        if script not in self.command_queue and self.send_gcode(None, script):
+            self.jog_hold_total += self.distance
+            self.update_jog_label()
+        return True
+
+    def stop_jog_hold(self):
+        if self.jog_hold_timer is not None:
+            GLib.source_remove(self.jog_hold_timer)
+            self.jog_hold_timer = None
+        self.jog_holding = False
+        self.jog_hold_direction = 0
+        self.jog_hold_total = 0
+        self.update_jog_label()
+
+    def update_jog_label(self):
+        label = self.labels.get("jog_pending_label")
+        if not label:
+            return
+        if self.jog_hold_total:
+            label.set_label(f"Jog {self.jog_hold_direction * self.jog_hold_total:+d} mm")
+        elif self.jog_pending:
+            label.set_label(f"Pending {self.jog_pending:+d} mm")
+        else:
+            label.set_label("")
 
     ##################
     # Spool Selector #
@@ -2207,6 +4658,7 @@ class Panel(ScreenPanel):
         self._screen.show_keyboard(entry, event)
         GLib.timeout_add(100, self.scroll_to_entry, entry)
 
+    @stall_tracked("scroll_to_entry")
     def scroll_to_entry(self, entry):
         """
         Scroll the view to ensure the specified entry is visible.
@@ -2364,52 +4816,1183 @@ class Panel(ScreenPanel):
         """
         logging.info(f"Update Spool button clicked with color: {self.selected_color}")
 
-        if self.spoolman is not None:
-            self._screen._send_action(button, "printer.gcode.script", {
-                "script": f'SET_SPOOL_ID LANE={self.selected_lane.name} SPOOL_ID=""'
-            })
+        lanes = self.bulk_spool_lanes or ([self.selected_lane] if self.selected_lane else [])
+        if not lanes:
+            logging.warning("Selected lane is not set or invalid. Skipping lane update.")
+            self.show_main_grid(button)
+            return
 
-        # Handle color
-        try:
-            color = self.selected_color.lstrip("#")
-            if color:
-                self._screen._send_action(button, "printer.gcode.script", {
-                    "script": f"SET_COLOR LANE={self.selected_lane.name} COLOR={color}"
-                })
-        except AttributeError:
-            logging.warning("Selected color is not set or invalid. Skipping color update.")
+        color = (self.selected_color or "").lstrip("#")
+        material = self.selected_type.upper() if self.selected_type else None
+        weight = self.selected_weight
 
-        # Handle filament type
-        try:
-            filament_type = self.selected_type
-            if filament_type:
-                self._screen._send_action(button, "printer.gcode.script", {
-                    "script": f"SET_MATERIAL LANE={self.selected_lane.name} MATERIAL={filament_type.upper()}"
-                })
-        except AttributeError:
-            logging.warning("Selected filament type is not set or invalid. Skipping material update.")
-
-        # Handle weight
-        try:
-            weight = self.selected_weight
+        commands = []
+        for lane in lanes:
+            if self.spoolman is not None:
+                commands.append(f'SET_SPOOL_ID LANE={lane.name} SPOOL_ID=""')
+            if color:
+                commands.append(f"SET_COLOR LANE={lane.name} COLOR={color}")
+            if material:
+                commands.append(f"SET_MATERIAL LANE={lane.name} MATERIAL={material}")
             if weight:
-                self._screen._send_action(button, "printer.gcode.script", {
-                    "script": f"SET_WEIGHT LANE={self.selected_lane.name} WEIGHT={weight}"
-                })
-        except AttributeError:
-            logging.warning("Selected weight is not set or invalid. Skipping weight update.")
+                commands.append(f"SET_WEIGHT LANE={lane.name} WEIGHT={weight}")
 
-        # Handle lane
-        try:
-            lane = self.selected_lane
-            if not lane:
-                logging.warning("Selected lane is not set or invalid. Skipping lane update.")
-        except AttributeError:
-            logging.warning("Selected lane is not set or invalid. Skipping lane update.")
+        if self.bulk_spool_lanes:
+            # update_ui stores weights rounded to whole grams
+            try:
+                expected_weight = round(float(weight)) if weight else None
+            except (TypeError, ValueError):
+                expected_weight = None
+
+            def spool_applied(lane):
+                return ((not color or (lane.color or "").lstrip("#").upper() == color.upper())
+                        and (not material or (lane.material or "").upper() == material)
+                        and (expected_weight is None or lane.weight == expected_weight))
+
+            self.run_bulk_operation(button, _("Set spool"), commands, {lane.name: spool_applied for lane in lanes})
+            self.bulk_spool_lanes = []
+        else:
+            self.send_gcode_batch(button, commands)
 
         # Return to the main grid
         self.show_main_grid(button)
 
+    ##################
+    #   Lane Tests   #
+    ##################
+
+    def start_lane_tests(self, button):
+        """
+        Test every lane in order, recording the duration and outcome of each.
+
+        Tests run one after the other: Klipper executes G-code scripts
+        serially, so lanes in different units cannot be tested concurrently.
+        """
+        if self.lane_test_running is not None:
+            self._screen.show_popup_message(_("Lane tests already running"), 1)
+            return
+        self.lane_tests = [LaneTestRun(lane.name, unit.name) for unit in self.afc_units for lane in unit.lanes]
+        self.show_test_results_grid(button)
+        self.run_next_lane_test()
+
+    def stop_lane_tests(self, button):
+        """
+        Skip the remaining lanes once the current test finishes.
+        """
+        for run in self.lane_tests:
+            if run.outcome == "pending":
+                run.outcome = "skipped"
+        self.update_test_results()
+
+    def run_next_lane_test(self):
+        run = next((run for run in self.lane_tests if run.outcome == "pending"), None)
+        self.lane_test_running = run
+        if run is None:
+            logging.info("Lane tests finished")
+            self.update_test_results()
+            return
+        lane = self.lane_by_name.get(run.lane)
+        run.start_status = lane.status if lane else None
+        run.started = time.monotonic()
+        run.outcome = "running"
+        if not self.send_gcode(None, f"TEST LANE={run.lane}",
+                               lambda response, run=run: self.on_lane_test_finished(run, response)):
+            run.finished = run.started
+            run.outcome = "skipped"
+            run.detail = _("A test of this lane was already running")
+            self.run_next_lane_test()
+            return
+        self.update_test_results()
+
+    def on_lane_test_finished(self, run, response):
+        run.finished = time.monotonic()
+        if isinstance(response, dict) and "error" in response:
+            error = response["error"]
+            run.outcome = "failed"
+            run.detail = error.get("message", str(error)) if isinstance(error, dict) else str(error)
+        elif run.outcome == "running":
+            lane = self.lane_by_name.get(run.lane)
+            if lane and lane.status != run.start_status and lane.status in (PREP_NOT_LOAD, LOAD_NOT_PREP):
+                run.outcome = "warning"
+                run.detail = _("Lane ended in status: {}").format(lane.status)
+            else:
+                run.outcome = "ok"
+        logging.info(f"Lane test {run.lane}: {run.outcome} in {run.duration:.1f}s {run.detail}")
+        self.run_next_lane_test()
+
+    def create_test_results_layout(self):
+        vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
+        vbox.set_margin_start(10)
+        vbox.set_margin_end(10)
+        vbox.set_margin_top(5)
+        vbox.set_margin_bottom(5)
+
+        header = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+        back_button = self._gtk.Button("back", _("Back"), "color2")
+        back_button.connect("clicked", self.show_main_grid)
+        header.pack_start(back_button, False, False, 0)
+        stop_button = self._gtk.Button("cancel", _("Stop"), "color1")
+        stop_button.connect("clicked", self.stop_lane_tests)
+        header.pack_start(stop_button, False, False, 0)
+        export_button = self._gtk.Button("complete", _("Export"), "color3")
+        export_button.connect("clicked", self.export_test_results)
+        header.pack_start(export_button, False, False, 0)
+        summary_label = Gtk.Label()
+        summary_label.set_hexpand(True)
+        self.labels["test_summary_label"] = summary_label
+        header.pack_start(summary_label, True, True, 0)
+        vbox.pack_start(header, False, False, 0)
+
+        self.test_results_table = Gtk.Grid(row_spacing=4, column_spacing=20)
+        scroll = self._gtk.ScrolledWindow()
+        scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        scroll.set_vexpand(True)
+        scroll.add(self.test_results_table)
+        vbox.pack_start(scroll, True, True, 0)
+
+        self.test_results_grid.attach(vbox, 0, 0, 1, 1)
+        self.test_results_grid.show_all()
+
+    def show_test_results_grid(self, button):
+        if self.test_results_table is None:
+            self.create_test_results_layout()
+        self.update_test_results()
+        self.screen_stack.set_visible_child_name("test_results_grid")
+
+    def update_test_results(self):
+        """
+        Rebuild the results table, highlighting slow and failing lanes.
+        """
+        if self.test_results_table is None:
+            return
+        for child in self.test_results_table.get_children():
+            self.test_results_table.remove(child)
+            child.destroy()
+
+        for col, heading in enumerate((_("Lane"), _("Unit"), _("Duration"), _("Outcome"), _("Detail"))):
+            label = Gtk.Label(label=heading, xalign=0)
+            label.get_style_context().add_class("bold-text")
+            self.test_results_table.attach(label, col, 0, 1, 1)
+
+        durations = sorted(run.duration for run in self.lane_tests if run.outcome in ("ok", "warning"))
+        median = durations[len(durations) // 2] if durations else None
+
+        for row, run in enumerate(self.lane_tests, start=1):
+            duration = run.duration
+            cells = (run.lane, run.unit, f"{duration:.1f}s" if duration is not None else "-", run.outcome, run.detail)
+            style = None
+            if run.outcome == "failed":
+                style = "status-lane-empty"
+            elif run.outcome == "warning" or (
+                    median and duration is not None and run.finished and duration > median * LANE_TEST_SLOW_FACTOR):
+                style = "status-warning"
+            elif run.outcome == "ok":
+                style = "status-loaded"
+            for col, text in enumerate(cells):
+                label = Gtk.Label(label=text, xalign=0)
+                if style:
+                    label.get_style_context().add_class(style)
+                self.test_results_table.attach(label, col, row, 1, 1)
+        self.test_results_table.show_all()
+
+        finished = [run for run in self.lane_tests if run.outcome not in ("pending", "running")]
+        failed = [run for run in self.lane_tests if run.outcome == "failed"]
+        self.labels["test_summary_label"].set_label(
+            _("{} of {} tested, {} failed").format(len(finished), len(self.lane_tests), len(failed)))
+
+    def export_test_results(self, button):
+        """
+        Write the lane test results as CSV next to the KlipperScreen log.
+        """
+        if not self.lane_tests:
+            self._screen.show_popup_message(_("No lane test results to export"), 1)
+            return
+        path = os.path.join(get_log_dir(), f"afc_lane_tests_{datetime.now():%Y%m%d_%H%M%S}.csv")
+        try:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["lane", "unit", "duration_s", "outcome", "detail"])
+                for run in self.lane_tests:
+                    duration = run.duration
+                    writer.writerow([run.lane, run.unit, f"{duration:.2f}" if duration is not None else "",
+                                     run.outcome, run.detail])
+        except OSError as e:
+            logging.error(f"Failed to export lane test results: {e}")
+            self._screen.show_popup_message(_("Export failed: {}").format(e))
+            return
+        logging.info(f"Lane test results exported to {path}")
+        self._screen.show_popup_message(_("Exported to {}").format(path), 1)
+
+    ##################
+    #  Multi-select  #
+    ##################
+
+    def create_bulk_grid(self):
+        """
+        Create the action bar shown while lanes are being multi-selected.
+        """
+        hbox = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
+        hbox.set_hexpand(False)
+        hbox.set_vexpand(False)
+        hbox.set_margin_bottom(5)
+        hbox.set_margin_start(10)
+        hbox.set_margin_end(10)
+
+        done_button = self._gtk.Button("back", _("Done"), "color2")
+        done_button.connect("clicked", self.exit_select_mode)
+        hbox.pack_start(done_button, False, False, 5)
+
+        all_button = Gtk.Button(label=_("All"))
+        all_button.connect("clicked", self.on_select_all_clicked, True)
+        hbox.pack_start(all_button, False, False, 0)
+        none_button = Gtk.Button(label=_("None"))
+        none_button.connect("clicked", self.on_select_all_clicked, False)
+        hbox.pack_start(none_button, False, False, 0)
+
+        actions = (
+            ("eject", _("Eject"), "color1", self.on_bulk_eject_clicked),
+            ("spool", _("Set Spool"), "color3", self.on_bulk_spool_clicked),
+            ("runout", _("Clear\nRunout"), "color4", self.on_bulk_clear_runout_clicked),
+            ("map_default", _("Map\nDefault"), "color2", self.on_bulk_map_preset_clicked),
+            ("map_sequential", _("Map\nSequential"), "color2", self.on_bulk_map_preset_clicked),
+        )
+        for key, label, style, handler in actions:
+            button = Gtk.Button(label=label)
+            button.get_style_context().add_class(style)
+            if key.startswith("map_"):
+                button.connect("clicked", handler, key[4:])
+            else:
+                button.connect("clicked", handler)
+            self.action_buttons[f"bulk_{key}"] = button
+            hbox.pack_start(button, False, False, 0)
+
+        progress_label = Gtk.Label(label=_("0 selected"))
+        progress_label.set_hexpand(True)
+        progress_label.set_halign(Gtk.Align.END)
+        self.labels["bulk_progress_label"] = progress_label
+        hbox.pack_start(progress_label, True, True, 5)
+
+        return hbox
+
+    def enter_select_mode(self, button):
+        self.select_mode = True
+        for lane_name in self.afc_lanes:
+            check = self.buttons.get(f"{lane_name}_select")
+            if check:
+                check.set_label("")
+                check.show()
+        self.update_bulk_label()
+        self.stack.set_visible_child_name("bulk_grid")
+
+    def exit_select_mode(self, button):
+        self.select_mode = False
+        self.selected_lanes = []
+        self.cancel_bulk_operation()
+        for lane_name in self.afc_lanes:
+            check = self.buttons.get(f"{lane_name}_select")
+            if check:
+                check.set_active(False)
+                check.hide()
+        self.stack.set_visible_child_name("control_grid")
+
+    def on_lane_select_toggled(self, check, lane):
+        if check.get_active():
+            if lane.name not in self.selected_lanes:
+                self.selected_lanes.append(lane.name)
+        elif lane.name in self.selected_lanes:
+            self.selected_lanes.remove(lane.name)
+        self.update_bulk_label()
+
+    def on_select_all_clicked(self, button, selected):
+        for lane_name in self.afc_lanes:
+            check = self.buttons.get(f"{lane_name}_select")
+            if check:
+                check.set_active(selected)
+
+    def get_selected_lanes(self):
+        lanes = [self.lane_by_name[name] for name in self.selected_lanes if name in self.lane_by_name]
+        if not lanes:
+            self._screen.show_popup_message(_("No lanes selected"), 1)
+        return lanes
+
+    def on_bulk_eject_clicked(self, button):
+        lanes = self.get_selected_lanes()
+        # A lane loaded to the toolhead has to be unloaded before it can be ejected
+        ejectable = [lane for lane in lanes if lane.status not in (TOOLED, LOADING, UNLOADING)]
+        if len(ejectable) != len(lanes):
+            self._screen.show_popup_message(_("Skipping lanes loaded to the toolhead"), 1)
+        self.run_bulk_operation(
+            button, _("Eject"), [f"LANE_UNLOAD LANE={lane.name}" for lane in ejectable],
+            {lane.name: lambda lane: lane.status in EJECT_SETTLED_STATUSES for lane in ejectable})
+
+    def on_bulk_spool_clicked(self, button):
+        lanes = self.get_selected_lanes()
+        if not lanes:
+            return
+        self.show_selector_grid(button, lanes[0])
+        self.bulk_spool_lanes = lanes
+        self.labels["title_label"].set_label(_("Change Spool ({} lanes)").format(len(lanes)))
+
+    def on_bulk_clear_runout_clicked(self, button):
+        lanes = self.get_selected_lanes()
+        self.run_bulk_operation(
+            button, _("Clear runout"), [f"SET_RUNOUT LANE={lane.name} RUNOUT=NONE" for lane in lanes],
+            {lane.name: lambda lane: lane.runout_lane in (None, "", "NONE") for lane in lanes})
+
+    def on_bulk_map_preset_clicked(self, button, preset):
+        """
+        Apply a tool map preset to the selected lanes.
+
+        ``default`` maps each lane to T<index> in system order, ``sequential``
+        maps the selection to T0, T1, ... in the order the lanes were selected.
+        """
+        lanes = self.get_selected_lanes()
+        if preset == "default":
+            targets = {lane.name: f"T{self.afc_lanes.index(lane.name)}" for lane in lanes}
+        else:
+            targets = {lane.name: f"T{index}" for index, lane in enumerate(lanes)}
+        self.run_bulk_operation(
+            button, _("Map preset"), [f"SET_MAP LANE={name} MAP={target}" for name, target in targets.items()],
+            {name: (lambda lane, target=target: lane.map == target) for name, target in targets.items()})
+
+    def run_bulk_operation(self, button, title, commands, expectations):
+        """
+        Submit a bulk action as one script and follow each lane in the status stream.
+
+        :param expectations: Lane name -> predicate that is true once the lane
+                             reflects the action.
+        """
+        if not commands:
+            return
+        self.cancel_bulk_operation()
+        self.bulk_operation = {"title": title, "pending": dict(expectations), "total": len(expectations), "failed": 0}
+        for lane_name in expectations:
+            check = self.buttons.get(f"{lane_name}_select")
+            if check:
+                check.set_label("…")
+        self.update_bulk_label()
+        self.send_gcode_batch(button, commands, self.on_bulk_operation_response)
+
+    def on_bulk_operation_response(self, results):
+        if not self.bulk_operation:
+            return
+        for command, ok, _error in results:
+            if ok is not False:
+                continue  # Lanes not known to have failed are settled by their expectations
+            lane_name = next((name for name in self.bulk_operation["pending"] if f"LANE={name} " in f"{command} "),
+                             None)
+            if lane_name:
+                del self.bulk_operation["pending"][lane_name]
+                self.bulk_operation["failed"] += 1
+                check = self.buttons.get(f"{lane_name}_select")
+                if check:
+                    check.set_label("✗")
+        for lane_name in list(self.bulk_operation["pending"]):
+            self.update_bulk_progress(self.lane_by_name[lane_name])
+        if self.bulk_operation and self.bulk_operation["pending"]:
+            self.bulk_timer = GLib.timeout_add_seconds(BULK_SETTLE_TIMEOUT, self.expire_bulk_operation)
+        self.update_bulk_label()
+
+    def expire_bulk_operation(self):
+        """
+        Mark lanes that never reflected the bulk action as failed.
+        """
+        self.bulk_timer = None
+        if not self.bulk_operation:
+            return False
+        for lane_name in self.bulk_operation["pending"]:
+            logging.warning(f"{self.bulk_operation['title']}: {lane_name} did not settle "
+                            f"within {BULK_SETTLE_TIMEOUT}s")
+            self.bulk_operation["failed"] += 1
+            check = self.buttons.get(f"{lane_name}_select")
+            if check:
+                check.set_label("✗")
+        self.bulk_operation["pending"].clear()
+        self.update_bulk_label()
+        return False
+
+    def cancel_bulk_operation(self):
+        if self.bulk_timer is not None:
+            GLib.source_remove(self.bulk_timer)
+            self.bulk_timer = None
+        self.bulk_operation = None
+
+    def update_bulk_progress(self, lane):
+        """
+        Mark ``lane`` done once the status stream shows the bulk action applied.
+        """
+        expectation = self.bulk_operation["pending"].get(lane.name)
+        if expectation is None or not expectation(lane):
+            return
+        del self.bulk_operation["pending"][lane.name]
+        check = self.buttons.get(f"{lane.name}_select")
+        if check:
+            check.set_label("✓")
+        self.update_bulk_label()
+
+    def update_bulk_label(self):
+        label = self.labels.get("bulk_progress_label")
+        if not label:
+            return
+        text = _("{} selected").format(len(self.selected_lanes))
+        if self.bulk_operation:
+            total = self.bulk_operation["total"]
+            failed = self.bulk_operation["failed"]
+            done = total - len(self.bulk_operation["pending"]) - failed
+            progress = f"{self.bulk_operation['title']}: {done}/{total}"
+            if failed:
+                progress += _(" ({} failed)").format(failed)
+            text = f"{progress}  |  {text}"
+            if not self.bulk_operation["pending"]:
+                self.cancel_bulk_operation()
+        label.set_label(text)
+
+    ##################
+    #     G-code     #
+    ##################
+
+    def send_gcode(self, widget, script, on_ack=None):
+        """
+        Send a G-code script through the command queue.
+
+        :param widget: Button that triggered the action, disabled until the reply arrives.
+        :param on_ack: Called with the response once Klipper acknowledges.
+        :return: False if an identical script is still in flight.
+        """
+        logging.info(f"Sending G-code: {script}")
+        trace_recorder.instant(script, "user")
+        trace_id = None
+
+        def acknowledged(response):
+            # Round trips overlap each other and the UI spans, so they are async events
+            trace_recorder.async_end(script, "gcode", trace_id,
+                                     error=response.get("error") if isinstance(response, dict) else None)
+            if isinstance(widget, Gtk.Button):
+                widget.set_sensitive(True)
+            if isinstance(response, dict) and "error" in response:
+                logging.error(f"G-code '{script}' failed: {response['error']}")
+            if on_ack:
+                on_ack(response)
+
+        if not self.command_queue.submit(script, acknowledged):
+            self._screen.show_popup_message(_("Already running: {}").format(script), 1)
+            return False
+        trace_id = trace_recorder.async_begin(script, "gcode")
+        if isinstance(widget, Gtk.Button):
+            widget.set_sensitive(False)
+        return True
+
+    def send_gcode_batch(self, widget, commands, callback=None):
+        """
+        Send the commands of one user action as a single newline-joined script.
+
+        :param widget: Button that triggered the action, disabled until the reply arrives.
+        :param commands: G-code commands to run in order, empty entries are skipped.
+        :param callback: Called once with a list of (command, ok, error) tuples.
+                         ``ok`` is None for commands that were not run, or for
+                         every command when the error cannot be attributed.
+        :return: False if an identical batch is still in flight.
+        """
+        commands = [command for command in commands if command and command.strip()]
+        if not commands:
+            if callback:
+                callback([])
+            return True
+        return self.send_gcode(
+            widget, "\n".join(commands),
+            lambda response: self._on_gcode_batch_response(response, commands, callback))
+
+    def _on_gcode_batch_response(self, response, commands, callback):
+        error = response.get("error") if isinstance(response, dict) else None
+        if error is None:
+            results = [(command, True, None) for command in commands]
+        else:
+            message = error.get("message", str(error)) if isinstance(error, dict) else str(error)
+            failed = attribute_batch_error(commands, message)
+            if failed is None:
+                # Some lines may have run; callers settle them from the status stream
+                results = [(command, None, message) for command in commands]
+                self._screen.show_popup_message(message)
+            else:
+                results = [(command, True, None) for command in commands[:failed]]
+                results.append((commands[failed], False, message))
+                results.extend((command, None, None) for command in commands[failed + 1:])
+                self._screen.show_popup_message(f"{commands[failed]}: {message}")
+            logging.error(f"G-code batch failed: {message}")
+
+        if callback:
+            callback(results)
+
+    def propose_change(self, key, value, previous, apply, widget, script):
+        """
+        Apply a setting change locally and send the script making it on the printer.
+
+        :param key: Identifies the setting, e.g. ("map", lane name).
+        :param apply: Callable applying a value to the panel state and widgets.
+        """
+        version = self.optimistic.propose(key, value, previous, apply, widget)
+        self.set_change_style(widget, "change-pending")
+        if not self.send_gcode(widget, script, lambda response: self.on_change_acknowledged(key, version, response)):
+            self.optimistic.acknowledge(key, version, False)
+            self.set_change_style(widget, None)
+            return
+        if self.optimistic_timer is None:
+            self.optimistic_timer = GLib.timeout_add_seconds(1, self.check_pending_changes)
+
+    def on_change_acknowledged(self, key, version, response):
+        ok = not (isinstance(response, dict) and "error" in response)
+        change = self.optimistic.acknowledge(key, version, ok)
+        if change is not None:
+            self.flag_change(change, _("Printer rejected the change"))
+
+    def reconcile_change(self, key, authoritative):
+        """
+        Reconcile a status value with any pending change to the same setting.
+
+        :return: The value the panel should show.
+        """
+        value, change = self.optimistic.reconcile(key, authoritative)
+        if change is not None:
+            if value == change.value:
+                self.set_change_style(change.widget, None)
+            else:
+                self.flag_change(change, _("Printer reverted the change"))
+        return value
+
+    def check_pending_changes(self):
+        """
+        Roll back and flag changes the printer never confirmed.
+        """
+        for key, change in self.optimistic.expire():
+            self.flag_change(change, _("No confirmation from the printer"))
+        if len(self.optimistic) == 0:
+            self.optimistic_timer = None
+            return False
+        return True
+
+    def flag_change(self, change, reason):
+        logging.warning(f"{reason}: {change.value}")
+        self.set_change_style(change.widget, "change-rejected")
+        self._screen.show_popup_message(f"{reason}: {change.value}", 2)
+
+    def set_change_style(self, widget, style):
+        if widget is None:
+            return
+        context = widget.get_style_context()
+        context.remove_class("change-pending")
+        context.remove_class("change-rejected")
+        if style:
+            context.add_class(style)
+
+    def update_command_queue_label(self):
+        """
+        Show the queue depth and the latency of the last completed command.
+        """
+        label = self.labels.get("command_queue_label")
+        if not label:
+            return
+        text = f"Queue: {len(self.command_queue)}"
+        if self.command_queue.completed:
+            _script, ack_latency, visible_latency = self.command_queue.completed[-1]
+            text += f" | ack {ack_latency:.1f}s"
+            if visible_latency is not None:
+                text += f" / seen {visible_latency:.1f}s"
+        label.set_label(text)
+
+    ##################
+    #    History     #
+    ##################
+
+    def seed_history(self):
+        """
+        Seed the history with the state the panel was built from.
+        """
+        for lane in self.afc_lane_data:
+            for field in HISTORY_LANE_FIELDS:
+                self.history.seed("lane", lane.name, field, getattr(lane, field, None))
+        if not self.afc_system:
+            return
+        self.history.seed("system", "system", "current_load", self.afc_system.current_load)
+        for hub_name, hub in self.afc_system.hubs.items():
+            self.history.seed("hub", hub_name, "state", hub.state)
+        for buffer_name, buffer in self.afc_system.buffers.items():
+            self.history.seed("buffer", buffer_name, "state", buffer.state)
+
+    def record_lane_history(self, lane):
+        """
+        Record any lane fields that changed since the last update.
+        """
+        for field in HISTORY_LANE_FIELDS:
+            self.history.record("lane", lane.name, field, getattr(lane, field, None))
+
+    def create_history_layout(self):
+        """
+        Create the history viewer with a scrubber over the retained window.
+        """
+        vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
+        vbox.set_margin_start(10)
+        vbox.set_margin_end(10)
+        vbox.set_margin_top(5)
+        vbox.set_margin_bottom(5)
+
+        header = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+        back_button = self._gtk.Button("back", _("Back"), "color2")
+        back_button.connect("clicked", self.show_main_grid)
+        header.pack_start(back_button, False, False, 0)
+
+        time_label = Gtk.Label(label=_("Now"))
+        time_label.get_style_context().add_class("bold-text")
+        self.labels["history_time_label"] = time_label
+        header.pack_start(time_label, False, False, 0)
+
+        scale = Gtk.Scale.new_with_range(Gtk.Orientation.HORIZONTAL, -HISTORY_WINDOW_MINUTES * 60, 0, 1)
+        scale.set_draw_value(False)
+        scale.set_hexpand(True)
+        scale.set_value(0)
+        scale.connect("value-changed", self.on_history_scrubbed)
+        self.history_scale = scale
+        header.pack_start(scale, True, True, 0)
+        vbox.pack_start(header, False, False, 0)
+
+        state_label = Gtk.Label(xalign=0, yalign=0)
+        state_label.set_line_wrap(True)
+        state_label.get_style_context().add_class("history-text")
+        self.labels["history_state_label"] = state_label
+
+        scroll = self._gtk.ScrolledWindow()
+        scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        scroll.set_vexpand(True)
+        scroll.add(state_label)
+        vbox.pack_start(scroll, True, True, 0)
+
+        self.history_grid.attach(vbox, 0, 0, 1, 1)
+        self.history_grid.show_all()
+
+    def show_history_grid(self, button):
+        """
+        Switch to the history viewer, positioned at the current state.
+        """
+        if self.history_scale is None:
+            self.create_history_layout()
+
+        oldest, _newest = self.history.span()
+        lower = -HISTORY_WINDOW_MINUTES * 60
+        if oldest is not None:
+            lower = max(lower, oldest - time.monotonic())
+        self.history_scale.set_range(min(lower, -1), 0)
+        self.history_scale.set_value(0)
+        self.render_history(0)
+        self.screen_stack.set_visible_child_name("history_grid")
+
+    def on_history_scrubbed(self, scale):
+        self.render_history(scale.get_value())
+
+    def render_history(self, offset):
+        """
+        Render the lane, hub and buffer state ``offset`` seconds before now.
+        """
+        moment = time.monotonic() + offset
+        state = self.history.state_at(moment)
+
+        seconds = int(-offset)
+        time_label = self.labels.get("history_time_label")
+        if time_label:
+            time_label.set_label(_("Now") if seconds == 0 else f"-{seconds // 60}m {seconds % 60:02d}s")
+
+        def esc(value):
+            return GLib.markup_escape_text(str(value))
+
+        lines = []
+        current_load = state.get("system", {}).get("system", {}).get("current_load")
+        lines.append(f"<b>Loaded:</b> {esc(current_load or 'N/A')}")
+        for hub_name, hub in sorted(state.get("hub", {}).items()):
+            lines.append(f"<b>Hub {esc(hub_name)}:</b> {'active' if hub.get('state') else 'empty'}")
+        for buffer_name, buffer in sorted(state.get("buffer", {}).items()):
+            lines.append(f"<b>Buffer {esc(buffer_name)}:</b> {esc(buffer.get('state'))}")
+        lines.append("")
+
+        lanes = state.get("lane", {})
+        for lane_name in self.afc_lanes:
+            lane = lanes.get(lane_name)
+            if not lane:
+                continue
+            lines.append(
+                f"<b>{esc(lane_name)}</b>  {esc(lane.get('status'))}  {esc(lane.get('map'))}  "
+                f"{esc(lane.get('material'))}  {esc(lane.get('weight'))}g  {esc(lane.get('color'))}  "
+                f"∞ {esc(lane.get('runout_lane'))}  buffer: {esc(lane.get('buffer_status'))}"
+            )
+
+        changes = self.history.changes_between(moment - 60, moment)
+        if changes:
+            lines.append("")
+            lines.append(f"<b>{esc(_('Changes in the preceding minute:'))}</b>")
+            for entry_time, kind, name, field, value in changes[-10:]:
+                lines.append(esc(f"{entry_time - moment:+.1f}s  {kind} {name} {field} → {value}"))
+
+        state_label = self.labels.get("history_state_label")
+        if state_label:
+            state_label.set_markup("\n".join(lines))
+
+    ##################
+    #   Telemetry    #
+    ##################
+
+    def update_lane_telemetry(self, lane):
+        """
+        Redraw the lane's sparklines after a new telemetry sample.
+        """
+        sparkline = self.labels.get(f"{lane.name}_sparkline")
+        if sparkline:
+            sparkline.queue_draw()
+        if self.telemetry_lane == lane.name and self.screen_stack.get_visible_child_name() == "telemetry_grid":
+            self.update_telemetry_values(lane)
+            for field in LaneTelemetry.FIELDS:
+                self.labels[f"telemetry_{field}"].queue_draw()
+
+    def update_telemetry_values(self, lane):
+        """
+        Show the lane's current values next to the telemetry sparklines.
+        """
+        self.labels["telemetry_weight_value"].set_label(f"{lane.weight}g")
+        self.labels["telemetry_load_value"].set_label(str(lane.load))
+        self.labels["telemetry_prep_value"].set_label(str(lane.prep))
+        self.labels["telemetry_tool_loaded_value"].set_label(str(lane.tool_loaded))
+        self.labels["telemetry_buffer_status_value"].set_label(str(lane.buffer_status))
+
+    def on_lane_sparkline_draw(self, area, cr, lane):
+        telemetry = self.telemetry.get(lane.name)
+        if not telemetry:
+            return
+        values = telemetry.series("weight", window=self.telemetry_window, points=TELEMETRY_SPARKLINE_POINTS)
+        rgba = Gdk.RGBA()
+        if not (lane.color and rgba.parse(lane.color)):
+            rgba.parse("#429ef5")
+        draw_sparkline(cr, area.get_allocated_width(), area.get_allocated_height(), values,
+                       (rgba.red, rgba.green, rgba.blue, 1.0), low=0)
+
+    def on_telemetry_draw(self, area, cr, field):
+        telemetry = self.telemetry.get(self.telemetry_lane)
+        if not telemetry:
+            return
+        width = area.get_allocated_width()
+        values = telemetry.series(field, window=self.telemetry_window, points=max(2, width // 4))
+        if field in LaneTelemetry.FLAG_FIELDS:
+            draw_sparkline(cr, width, area.get_allocated_height(), values, (0.28, 0.75, 0.33, 1.0), low=0, high=1)
+        elif field == "buffer_status":
+            draw_sparkline(cr, width, area.get_allocated_height(), values, (0.92, 0.52, 0.06, 1.0), low=0)
+        else:
+            draw_sparkline(cr, width, area.get_allocated_height(), values, low=0)
+
+    def create_telemetry_layout(self):
+        """
+        Create the per-lane telemetry view with one sparkline per sampled field.
+        """
+        vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
+        vbox.set_margin_start(10)
+        vbox.set_margin_end(10)
+        vbox.set_margin_top(5)
+        vbox.set_margin_bottom(5)
+
+        header = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+        back_button = self._gtk.Button("back", _("Back"), "color2")
+        back_button.connect("clicked", self.show_main_grid)
+        header.pack_start(back_button, False, False, 0)
+
+        title_label = Gtk.Label()
+        title_label.get_style_context().add_class("bold-text")
+        self.labels["telemetry_title"] = title_label
+        header.pack_start(title_label, True, True, 0)
+
+        for name, seconds in TELEMETRY_WINDOWS:
+            window_button = Gtk.Button(label=name)
+            window_button.get_style_context().add_class("horizontal_togglebuttons")
+            if seconds == self.telemetry_window:
+                window_button.get_style_context().add_class("horizontal_togglebuttons_active")
+            window_button.connect("clicked", self.on_telemetry_window_clicked, seconds)
+            self.labels[f"telemetry_window_{seconds}"] = window_button
+            header.pack_start(window_button, False, False, 0)
+        vbox.pack_start(header, False, False, 0)
+
+        grid = Gtk.Grid(row_spacing=5, column_spacing=10)
+        for row, field in enumerate(LaneTelemetry.FIELDS):
+            label = Gtk.Label(label=field.replace("_", " ").capitalize(), xalign=0)
+            grid.attach(label, 0, row, 1, 1)
+            area = Gtk.DrawingArea()
+            area.set_hexpand(True)
+            area.set_size_request(-1, 40)
+            area.connect("draw", self.on_telemetry_draw, field)
+            self.labels[f"telemetry_{field}"] = area
+            grid.attach(area, 1, row, 1, 1)
+            value_label = Gtk.Label(xalign=1)
+            self.labels[f"telemetry_{field}_value"] = value_label
+            grid.attach(value_label, 2, row, 1, 1)
+        vbox.pack_start(grid, True, True, 0)
+
+        self.telemetry_grid.attach(vbox, 0, 0, 1, 1)
+        self.telemetry_grid.show_all()
+
+    def show_telemetry_grid(self, widget, event, lane):
+        """
+        Switch to the telemetry view for ``lane``.
+        """
+        if "telemetry_title" not in self.labels:
+            self.create_telemetry_layout()
+        self.telemetry_lane = lane.name
+        self.labels["telemetry_title"].set_label(_("Telemetry {}").format(lane.name))
+        self.update_telemetry_values(lane)
+        self.screen_stack.set_visible_child_name("telemetry_grid")
+        return True
+
+    def on_telemetry_window_clicked(self, button, seconds):
+        self.labels[f"telemetry_window_{self.telemetry_window}"].get_style_context().remove_class(
+            "horizontal_togglebuttons_active")
+        button.get_style_context().add_class("horizontal_togglebuttons_active")
+        self.telemetry_window = seconds
+        for field in LaneTelemetry.FIELDS:
+            self.labels[f"telemetry_{field}"].queue_draw()
+        for lane_name in self.afc_lanes:
+            sparkline = self.labels.get(f"{lane_name}_sparkline")
+            if sparkline:
+                sparkline.queue_draw()
+
+    ##################
+    #   Extruders    #
+    ##################
+
+    def update_extruder(self, name, extruder_data):
+        """
+        Apply one extruder's status, touching its overview row only if a field changed.
+        """
+        extruder = self.afc_system.extruders.get(name)
+        if extruder is None:
+            try:
+                extruder = Extruder(**extruder_data)
+            except TypeError as e:
+                logging.warning(f"Ignoring extruder {name}: {e}")
+                return
+            self.afc_system.extruders[name] = extruder
+            if self.extruder_overview is not None:
+                self.add_extruder_row(name)
+                self.extruder_overview.show_all()
+            return
+
+        changed = False
+        for field in EXTRUDER_FIELDS:
+            value = extruder_data.get(field, getattr(extruder, field))
+            if getattr(extruder, field) != value:
+                setattr(extruder, field, value)
+                self.history.record("extruder", name, field, value)
+                changed = True
+        if changed:
+            self.update_extruder_row(name)
+
+    def create_extruders_layout(self):
+        """
+        Create the extruder overview page, one row per extruder.
+        """
+        vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
+        vbox.set_margin_start(10)
+        vbox.set_margin_end(10)
+        vbox.set_margin_top(5)
+        vbox.set_margin_bottom(5)
+
+        header = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+        back_button = self._gtk.Button("back", _("Back"), "color2")
+        back_button.connect("clicked", self.show_main_grid)
+        header.pack_start(back_button, False, False, 0)
+
+        title = Gtk.Label(label=_("Extruders"))
+        title.get_style_context().add_class("bold-text")
+        header.pack_start(title, True, True, 0)
+        vbox.pack_start(header, False, False, 0)
+
+        self.extruder_overview = Gtk.Grid(column_spacing=15, row_spacing=5)
+        for column, heading in enumerate(
+                [_("Extruder"), _("Loaded"), _("Tool start"), "", _("Tool end"), "", _("Buffer"), _("Speed")]):
+            label = Gtk.Label(label=heading, xalign=0)
+            label.get_style_context().add_class("bold-text")
+            self.extruder_overview.attach(label, column, 0, 1, 1)
+
+        for name in sorted(self.afc_system.extruders if self.afc_system else {}):
+            self.add_extruder_row(name)
+
+        scroll = self._gtk.ScrolledWindow()
+        scroll.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
+        scroll.set_vexpand(True)
+        scroll.add(self.extruder_overview)
+        vbox.pack_start(scroll, True, True, 0)
+
+        self.extruders_grid.attach(vbox, 0, 0, 1, 1)
+        self.extruders_grid.show_all()
+
+    def add_extruder_row(self, name):
+        """
+        Append an overview row for an extruder and fill it in.
+        """
+        row = len(self.extruder_rows) + 1
+        labels = {}
+        for column, key in enumerate(
+                ["name", "lane_loaded", "tool_start", "tool_start_dot", "tool_end", "tool_end_dot", "buffer", "speed"]):
+            if key.endswith("_dot"):
+                widget = Gtk.Label(label=" ")
+                widget.set_size_request(20, 20)
+                widget.set_valign(Gtk.Align.CENTER)
+            else:
+                widget = Gtk.Label(xalign=0)
+                widget.set_ellipsize(Pango.EllipsizeMode.END)
+            labels[key] = widget
+            self.extruder_overview.attach(widget, column, row, 1, 1)
+        labels["name"].set_label(name)
+        self.extruder_rows[name] = labels
+        self.update_extruder_row(name)
+
+    def update_extruder_row(self, name):
+        """
+        Refresh one extruder's overview row, if the page has been built.
+        """
+        labels = self.extruder_rows.get(name)
+        extruder = self.afc_system.extruders.get(name) if self.afc_system else None
+        if not labels or extruder is None:
+            return
+
+        labels["lane_loaded"].set_label(extruder.lane_loaded or "N/A")
+        for sensor in ("tool_start", "tool_end"):
+            labels[sensor].set_label(getattr(extruder, sensor) or "N/A")
+            style = labels[f"{sensor}_dot"].get_style_context()
+            style.remove_class("status-empty")
+            style.remove_class("status-active")
+            if getattr(extruder, sensor):
+                style.add_class("status-active" if getattr(extruder, f"{sensor}_status") else "status-empty")
+
+        buffer = self.afc_system.buffers.get(extruder.buffer) if extruder.buffer else None
+        buffer_state = buffer.state if buffer else None
+        labels["buffer"].set_label(f"{extruder.buffer} - {buffer_state}" if buffer_state else (extruder.buffer or "N/A"))
+        labels["speed"].set_label(f"{extruder.tool_load_speed} / {extruder.tool_unload_speed}")
+
+        style = labels["name"].get_style_context()
+        if extruder.lane_loaded and extruder.lane_loaded == self.afc_system.current_load:
+            style.add_class("bold-text")
+        else:
+            style.remove_class("bold-text")
+
+    def show_extruders_grid(self, button):
+        if self.extruder_overview is None:
+            self.create_extruders_layout()
+        self.screen_stack.set_visible_child_name("extruders_grid")
+
+    ##################
+    #  Diagnostics   #
+    ##################
+
+    def create_diagnostics_layout(self):
+        """
+        Create the diagnostics page.
+        """
+        vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
+        vbox.set_margin_start(10)
+        vbox.set_margin_end(10)
+        vbox.set_margin_top(5)
+        vbox.set_margin_bottom(5)
+
+        header = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+        back_button = self._gtk.Button("back", _("Back"), "color2")
+        back_button.connect("clicked", self.show_main_grid)
+        header.pack_start(back_button, False, False, 0)
+
+        title = Gtk.Label(label=_("Diagnostics"))
+        title.get_style_context().add_class("bold-text")
+        header.pack_start(title, True, True, 0)
+
+        trace_button = self._gtk.Button("fine-tune", _("Trace memory"), "color3")
+        trace_button.connect("clicked", self.on_tracemalloc_clicked)
+        self.buttons["tracemalloc"] = trace_button
+        header.pack_start(trace_button, False, False, 0)
+
+        debug_button = self._gtk.Button("info", _("Debug log"), "color3")
+        debug_button.connect("clicked", self.on_debug_log_clicked)
+        header.pack_start(debug_button, False, False, 0)
+
+        export_button = self._gtk.Button("custom-script", _("Export trace"), "color4")
+        export_button.connect("clicked", self.on_export_trace_clicked)
+        header.pack_start(export_button, False, False, 0)
+        vbox.pack_start(header, False, False, 0)
+
+        diagnostics_label = Gtk.Label(xalign=0, yalign=0)
+        diagnostics_label.set_line_wrap(True)
+        diagnostics_label.get_style_context().add_class("history-text")
+        self.labels["diagnostics_label"] = diagnostics_label
+
+        scroll = self._gtk.ScrolledWindow()
+        scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        scroll.set_vexpand(True)
+        scroll.add(diagnostics_label)
+        vbox.pack_start(scroll, True, True, 0)
+
+        self.diagnostics_grid.attach(vbox, 0, 0, 1, 1)
+        self.diagnostics_grid.show_all()
+
+    def show_diagnostics_grid(self, button):
+        """
+        Switch to the diagnostics page and refresh it while it stays visible.
+        """
+        if "diagnostics_label" not in self.labels:
+            self.create_diagnostics_layout()
+        self.screen_stack.set_visible_child_name("diagnostics_grid")
+        self.render_diagnostics()
+        self.stall_detector.set_interval(STALL_HEARTBEAT_DIAGNOSTICS_MS)
+        if self.diagnostics_timer is None:
+            self.diagnostics_timer = GLib.timeout_add_seconds(DIAGNOSTICS_REFRESH_INTERVAL, self.refresh_diagnostics)
+
+    def diagnostics_visible(self):
+        return self.screen_stack.get_visible_child_name() == "diagnostics_grid"
+
+    def refresh_diagnostics(self):
+        if not self.update_info or not self.diagnostics_visible():
+            self.diagnostics_timer = None
+            self.stall_detector.set_interval(STALL_HEARTBEAT_MS)
+            return False
+        self.render_diagnostics()
+        return True
+
+    def render_diagnostics(self):
+        label = self.labels.get("diagnostics_label")
+        if label:
+            label.set_text("\n".join(
+                self.stall_diagnostics() + [""] + self.traffic_diagnostics() + [""] + self.memory_diagnostics()
+            ))
+
+    def stall_diagnostics(self):
+        """
+        Return the main loop stall summary as text lines.
+        """
+        detector = self.stall_detector
+        lines = [
+            _("Startup: {}").format(", ".join(
+                f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in STARTUP_PROFILE.items())),
+            _("Debug log: {}").format(_("on") if panel_log.debug_enabled else _("off")),
+            _("Main loop"),
+            f"  stalls > {detector.budget_ms}ms: {detector.stalls}   worst: {detector.worst_ms:.0f}ms",
+        ]
+        for name, (count, worst, total) in detector.worst_offenders():
+            lines.append(f"  {name:<24} {count:>4}x  worst {worst:>6.0f}ms  avg {total / count:>6.0f}ms")
+        for wall, latency, culprit in reversed(detector.recent):
+            lines.append(f"  {datetime.fromtimestamp(wall).strftime('%H:%M:%S')}  {latency:>6.0f}ms  {culprit}")
+        return lines
+
+    def traffic_diagnostics(self):
+        """
+        Return websocket message rates over TRAFFIC_WINDOWS as text lines.
+        """
+        now = time.monotonic()
+        header = "".join(f"{f'{window}s':>9}" for window in TRAFFIC_WINDOWS)
+        lines = [_("Websocket traffic (per second)"), f"  {'':<30}{header}{'total':>9}"]
+        keys = sorted(key for key in self.traffic.totals if key.startswith("action:"))
+        keys += [key for key in ("ui_change", "noop", "rest", "bytes") if key in self.traffic.totals]
+        for key in keys:
+            rates = "".join(f"{self.traffic.rate(key, window, now):>9.1f}" for window in TRAFFIC_WINDOWS)
+            lines.append(f"  {key.replace('action:', ''):<30}{rates}{self.traffic.totals[key]:>9.0f}")
+        return lines
+
+    def memory_diagnostics(self):
+        """
+        Return widget, pixbuf, registry and GLib source accounting as text lines.
+        """
+        lines = [_("Memory")]
+        rss = get_rss_bytes()
+        if rss is not None:
+            lines.append(f"  RSS: {rss / 1048576:.1f} MiB")
+
+        widget_counts = {}
+        pixbufs = {}
+        for widget in walk_widgets(self.content):
+            type_name = type(widget).__name__
+            widget_counts[type_name] = widget_counts.get(type_name, 0) + 1
+            if isinstance(widget, Gtk.Image) and widget.get_storage_type() == Gtk.ImageType.PIXBUF:
+                pixbuf = widget.get_pixbuf()
+                if pixbuf is not None:
+                    pixbufs[id(pixbuf)] = pixbuf
+        lines.append(f"  widgets: {sum(widget_counts.values())}")
+        for type_name, count in sorted(widget_counts.items(), key=lambda item: item[1], reverse=True)[:10]:
+            lines.append(f"    {type_name:<22} {count:>5}")
+
+        lane_icons = {}
+        for unit in self.afc_units:
+            for lane in unit.lanes:
+                icon = getattr(lane, "_icon", None)
+                if icon is not None:
+                    lane_icons[id(icon)] = icon
+        icon_bytes = sum(pixbuf.get_byte_length() for pixbuf in lane_icons.values())
+        other_bytes = sum(pixbuf.get_byte_length() for key, pixbuf in pixbufs.items() if key not in lane_icons)
+        lines.append(f"  lane icon pixbufs: {len(lane_icons)} ({icon_bytes / 1024:.0f} KiB)")
+        lines.append(f"  other shown pixbufs (logos): {len(pixbufs.keys() - lane_icons.keys())} "
+                     f"({other_bytes / 1024:.0f} KiB)")
+
+        for name in ("labels", "buttons", "action_buttons", "lane_widgets"):
+            registry = getattr(self, name, {})
+            detached = sum(
+                1 for widget in registry.values()
+                if isinstance(widget, Gtk.Widget) and widget.get_parent() is None
+            )
+            lines.append(f"  self.{name}: {len(registry)} entries, {detached} detached")
+
+        sources = [name for name in GLIB_SOURCE_ATTRS if getattr(self, name, None) is not None]
+        if self.stall_detector.timer is not None:
+            sources.append("stall_detector")
+        pending_grids = len(getattr(self, "_pending_lane_grid_updates", {}))
+        lines.append(f"  GLib sources: {len(sources) + pending_grids} "
+                     f"({', '.join(sources) or '-'}; lane grid updates: {pending_grids})")
+
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            lines.append(f"  tracemalloc: {current / 1024:.0f} KiB traced, peak {peak / 1024:.0f} KiB")
+            if self.tracemalloc_diff:
+                lines.append(_("  growth since previous activation:"))
+                lines.extend(f"    {stat}" for stat in self.tracemalloc_diff)
+        return lines
+
+    def on_debug_log_clicked(self, button):
+        panel_log.debug_enabled = not panel_log.debug_enabled
+        logging.info(f"AFC panel debug logging {'enabled' if panel_log.debug_enabled else 'disabled'}")
+        self.render_diagnostics()
+
+    def on_export_trace_clicked(self, button):
+        """
+        Write the recorded trace next to the KlipperScreen log.
+        """
+        filename = f"AFC_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        path = os.path.join(get_log_dir(), filename)
+        try:
+            count = trace_recorder.export(path)
+        except OSError as e:
+            logging.error(f"Could not write trace to {path}: {e}")
+            self._screen.show_popup_message(_("Could not write {}").format(path))
+            return
+        logging.info(f"Wrote {count} trace events to {path}")
+        self._screen.show_popup_message(_("Trace saved to {}").format(path), 1)
+
+    def take_tracemalloc_snapshot(self):
+        """
+        Diff a tracemalloc snapshot against the one from the previous activation.
+        """
+        if not tracemalloc.is_tracing():
+            return
+        snapshot = tracemalloc.take_snapshot()
+        if self.tracemalloc_snapshot is not None:
+            self.tracemalloc_diff = snapshot.compare_to(self.tracemalloc_snapshot, "lineno")[:TRACEMALLOC_TOP]
+        self.tracemalloc_snapshot = snapshot
+
+    def on_tracemalloc_clicked(self, button):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            self.tracemalloc_snapshot = None
+            self.tracemalloc_diff = []
+            logging.info("AFC tracemalloc stopped")
+        else:
+            tracemalloc.start()
+            self.take_tracemalloc_snapshot()
+            logging.info("AFC tracemalloc started")
+        self.render_diagnostics()
+
     ##################
     #    Sensors     #
     ##################
@@ -2537,10 +6120,12 @@ class Panel(ScreenPanel):
         :return: Dictionary containing the status of the sensors.
         """
         # Here we send the request and parse the result into a dictionary
-        logging.info("Fetching filament sensor data from the printer API")
+        panel_log.debug("sensors", "Fetching filament sensor data from the printer API")
         sensor_query = "&".join(self.filament_sensors)
-        result = self.apiClient.send_request(f"printer/objects/query?{sensor_query}")
+        with trace_recorder.span("printer/objects/query", "network"):
+            result = self.apiClient.send_request(f"printer/objects/query?{sensor_query}")
         sensor_data = result.get("status", {})
+        shared_state.sensor_status = sensor_data
         return sensor_data
 
     def update_sensors(self, data):
@@ -2560,7 +6145,7 @@ class Panel(ScreenPanel):
 
         sensor_name = "filament_switch_sensor virtual_bypass"
         vb_status = data.get(sensor_name, {}).get("filament_detected", False)
-        self.update_virtual_bypass_toggle(vb_status)
+        self.update_virtual_bypass_toggle(self.reconcile_change(("virtual_bypass",), vb_status))
 
     def on_refresh_clicked(self, button):
         """
@@ -2576,6 +6161,8 @@ class Panel(ScreenPanel):
 
     def log_lane_widget_sizes(self):
         """One-shot: log frame + all children sizes for each lane."""
+        if not panel_log.debug_enabled:
+            return False
         logging.info("=== AFC lane widget dump start ===")
         for unit in self.afc_units:
             for lane in unit.lanes:
@@ -2635,15 +6222,15 @@ class Panel(ScreenPanel):
         return False  # for GLib.idle_add: run once
 
     def on_size_allocate(self, widget, allocation, name=None):
-        logging.info(f"size-allocate: {name or widget.get_name()} -> w={allocation.width}, h={allocation.height}")
+        panel_log.debug("layout", "size-allocate: %s -> w=%d, h=%d", name or widget.get_name(),
+                        allocation.width, allocation.height)
 
 
 ###################
 #    CSS Styles   #
 ###################
 # Additional CSS to style the lane boxes
-inline_provider = Gtk.CssProvider()
-inline_provider.load_from_data(b"""
+PANEL_CSS = b"""
 dialog label {
     color: white;
 }
@@ -2774,16 +6361,25 @@ dialog button {
     padding-bottom: 0.1em;
     border-bottom: .4em solid #48bf53;
 }
+.change-pending {
+    border: 2px dashed #eb8510;
+}
+.change-rejected {
+    border: 2px solid #e32929;
+}
+.lane-drift {
+    color: #eb8510;
+    font-weight: bold;
+}
+.history-text {
+    font-family: monospace;
+}
 .vb_inactive {
     box-shadow: inset 0 4px 12px 0 rgba(100,100,100,0.4);
     padding: 0.33em;
     padding-bottom: 0.1em;
     border-bottom: .4em solid #8c8c8c;
 }
-""")
+"""
 
-Gtk.StyleContext.add_provider_for_screen(
-    Gdk.Screen.get_default(),
-    inline_provider,
-    Gtk.STYLE_PROVIDER_PRIORITY_USER
-)
+STARTUP_PROFILE["import"] = time.perf_counter() - _IMPORT_STARTED
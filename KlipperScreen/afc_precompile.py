@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# Armored Turtle Automated Filament Control
+#
+# Copyright (C) 2024-2025 Armored Turtle
+#
+# This file may be distributed under the terms of the GNU GPLv3 license.
+
+"""
+Pre-render the AFC panel's SVG assets to PNG.
+
+Run by install.sh with the KlipperScreen Python environment. Unit logos and the
+spool icon layers (back, filament mask, front) are rendered at the sizes the
+panel uses, at 1x and 2x, into ``afc_icons/precompiled`` together with a
+manifest of SHA-256 hashes. The panel only uses an asset when both the PNG and
+the SVG it was rendered from still match the manifest, and renders the SVG
+otherwise.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import xml.etree.ElementTree as ET
+
+import gi
+
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import GdkPixbuf, GLib
+
+# Must match the sizes and names used by AFC.py
+MANIFEST_FORMAT = 1
+MANIFEST_NAME = "manifest.json"
+PRECOMPILED_DIR = "precompiled"
+SPOOL_SVG = "FilamentReelIcon.svg"
+LOGO_SIZES = (45,)
+SPOOL_SIZES = ((40, 70),)
+SCALES = (1, 2)
+SPOOL_LAYERS = {
+    "back": ("spool_right_rim", "spool_right", "spool_tube"),
+    "mask": ("filament_base",),
+    "front": ("spool_left_rim", "spool_left", "spool_hole"),
+}
+
+SVG_NS = "http://www.w3.org/2000/svg"
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def render_svg(data, width, height, preserve_aspect_ratio=False):
+    """
+    Render SVG bytes to a pixbuf of the given size.
+    """
+    loader = GdkPixbuf.PixbufLoader()
+
+    def on_size_prepared(loader, natural_width, natural_height):
+        if preserve_aspect_ratio and natural_width and natural_height:
+            ratio = min(width / natural_width, height / natural_height)
+            loader.set_size(round(natural_width * ratio), round(natural_height * ratio))
+        else:
+            loader.set_size(width, height)
+
+    loader.connect("size-prepared", on_size_prepared)
+    loader.write(data)
+    loader.close()
+    return loader.get_pixbuf()
+
+
+def spool_layer_svg(path, layer):
+    """
+    Return the spool SVG reduced to the paths of one layer. The filament mask
+    is filled opaque white so the panel can tint it with the lane color.
+    """
+    ET.register_namespace("", SVG_NS)
+    tree = ET.parse(path)
+    root = tree.getroot()
+    keep = SPOOL_LAYERS[layer]
+    for parent in list(root.iter()):
+        for child in list(parent):
+            element_id = child.get("id")
+            if child.tag.endswith("path") and element_id not in keep:
+                parent.remove(child)
+            elif element_id == "filament_base":
+                child.set("style", "fill: #ffffff")
+                child.attrib.pop("clip-path", None)
+    return ET.tostring(root)
+
+
+def save_png(pixbuf, output_dir, name, assets, source, source_hash, **info):
+    path = os.path.join(output_dir, name)
+    pixbuf.savev(path, "png", [], [])
+    assets[name] = {
+        "sha256": sha256_file(path),
+        "source": source,
+        "source_sha256": source_hash,
+        "width": pixbuf.get_width(),
+        "height": pixbuf.get_height(),
+        **info,
+    }
+
+
+def precompile(icons_dir):
+    output_dir = os.path.join(icons_dir, PRECOMPILED_DIR)
+    os.makedirs(output_dir, exist_ok=True)
+    assets = {}
+
+    for filename in sorted(os.listdir(icons_dir)):
+        if not filename.endswith(".svg") or filename == SPOOL_SVG:
+            continue
+        path = os.path.join(icons_dir, filename)
+        source_hash = sha256_file(path)
+        with open(path, "rb") as handle:
+            data = handle.read()
+        stem = os.path.splitext(filename)[0]
+        for size in LOGO_SIZES:
+            for scale in SCALES:
+                try:
+                    pixbuf = render_svg(data, size * scale, size * scale, preserve_aspect_ratio=True)
+                except GLib.Error as e:
+                    logging.warning(f"Could not render {filename}: {e}")
+                    break
+                suffix = "@2x" if scale == 2 else ""
+                save_png(pixbuf, output_dir, f"{stem}_{size}{suffix}.png", assets, filename, source_hash,
+                         size=size, scale=scale)
+
+    spool_path = os.path.join(icons_dir, SPOOL_SVG)
+    spool_hash = sha256_file(spool_path)
+    for layer in SPOOL_LAYERS:
+        data = spool_layer_svg(spool_path, layer)
+        for width, height in SPOOL_SIZES:
+            for scale in SCALES:
+                pixbuf = render_svg(data, width * scale, height * scale)
+                suffix = "@2x" if scale == 2 else ""
+                save_png(pixbuf, output_dir, f"spool_{layer}_{width}x{height}{suffix}.png", assets,
+                         SPOOL_SVG, spool_hash, scale=scale)
+
+    manifest = {"format": MANIFEST_FORMAT, "assets": assets}
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(f"{manifest_path}.tmp", "w") as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    return len(assets), output_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "icons_dir", nargs="?",
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "afc_icons"),
+        help="Directory holding the AFC SVG icons (default: afc_icons next to this script)",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+    try:
+        count, output_dir = precompile(args.icons_dir)
+    except (OSError, GLib.Error, ET.ParseError) as e:
+        logging.error(f"Asset precompilation failed: {e}")
+        return 1
+    logging.info(f"Wrote {count} assets to {output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
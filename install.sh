@@ -133,6 +133,22 @@ function link_icons() {
   echo "[INFO] Icons linked to all themes."
 }
 
+function precompile_assets() {
+  local python_bin="$HOME/.KlipperScreen-env/bin/python"
+  local script="$afc_klipperscreen_path/KlipperScreen/afc_precompile.py"
+
+  if [ ! -x "$python_bin" ]; then
+    python_bin=$(command -v python3)
+  fi
+
+  echo "[INFO] Precompiling AFC panel assets..."
+  if "$python_bin" "$script" "$afc_klipperscreen_path/KlipperScreen/afc_icons"; then
+    echo "[INFO] AFC panel assets precompiled."
+  else
+    echo "[WARN] Asset precompilation failed, the panel will render SVG icons at runtime."
+  fi
+}
+
 function install_files() {
   local exclude_paths exclude_file
 
@@ -231,6 +247,7 @@ function uninstall() {
   rm -f "$printer_config/AFC_menu.conf"
   rm -f "$klipperscreen_dir/panels/AFC.py"
   rm -rf "$klipperscreen_dir/afc_icons"
+  rm -rf "$afc_klipperscreen_path/KlipperScreen/afc_icons/precompiled"
   echo "[INFO] Uninstall complete."
   exit 0
 }
@@ -267,6 +284,7 @@ main() {
   install_files
   ensure_afc_config "$klipperscreen_conf_file"
   link_icons
+  precompile_assets
   echo "[INFO] AFC-Klipper-Screen-Add-On installed successfully."
   echo "[INFO] Please restart KlipperScreen to apply changes."
 }